@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from plotly.subplots import make_subplots
+import plotly.colors
+from figspec import FigureSpec, figure_layout, scattergl, heatmap
+from data import to_timezone
+
+# plotly.py expands named scales to its own stops, which differ from plotly.js's built-in "RdBu"
+RDBU = [[i / (len(plotly.colors.diverging.RdBu) - 1), color] for i, color in enumerate(plotly.colors.diverging.RdBu)]
+
+def align_closes(frames):
+    closes = {ticker: df["Close"] for ticker, df in frames.items() if not df.empty}
+    if not closes:
+        return pd.DataFrame()
+    return pd.concat(closes, axis=1).sort_index()
+
+def forward_fill(values):
+    valid = ~np.isnan(values)
+    rows = np.where(valid, np.arange(values.shape[0])[:, None], 0)
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    filled = values[rows, np.arange(values.shape[1])]
+    # leading gaps stay empty rather than borrowing row 0
+    filled[np.cumsum(valid, axis=0) == 0] = np.nan
+    return filled
+
+def rebase(values, base=100.0):
+    filled = forward_fill(values)
+    first_rows = np.argmax(~np.isnan(values), axis=0)
+    first = filled[first_rows, np.arange(values.shape[1])]
+    return filled / first * base
+
+def log_returns(values):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        logs = np.log(values)
+    returns = np.full_like(logs, np.nan)
+    returns[1:] = logs[1:] - logs[:-1]
+    return returns
+
+def pairwise_corr(returns, min_periods=5):
+    # Pearson over pairwise-complete rows, done as matrix products instead of a pair loop
+    mask = (~np.isnan(returns)).astype(float)
+    x = np.nan_to_num(returns)
+    n = mask.T @ mask
+    sum_x = x.T @ mask
+    sum_xx = (x * x).T @ mask
+    sum_xy = x.T @ x
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sum_xy - sum_x * sum_x.T / n
+        var_x = sum_xx - sum_x ** 2 / n
+        corr = cov / np.sqrt(var_x * var_x.T)
+
+    corr[n < min_periods] = np.nan
+    np.fill_diagonal(corr, 1.0)
+    return np.clip(corr, -1.0, 1.0)
+
+@lru_cache(maxsize=32)
+def comparison_layout(theme, window, showlegend):
+    is_dark = "dark" in theme.lower()
+    fig = make_subplots(
+        rows=1, cols=2,
+        column_widths=[0.6, 0.4],
+        horizontal_spacing=0.08,
+        subplot_titles=["Performance (rebased to 100)", f"Correlation (last {window} bars)"]
+    )
+    fig.update_layout(
+        template="plotly_dark" if is_dark else "plotly",
+        margin=dict(t=50, b=40),
+        showlegend=showlegend
+    )
+    fig.update_yaxes(autorange="reversed", row=1, col=2)
+    return figure_layout(fig)
+
+def create_comparison_html(frames, theme="default", timezone="UTC", interval="1d", window=60):
+    closes = align_closes(frames)
+    if closes.empty:
+        return "<h2>No data available.</h2>"
+
+    closes = to_timezone(closes, timezone, interval)
+    tickers = list(closes.columns)
+    values = closes.to_numpy(dtype=float)
+
+    rebased = rebase(values)
+    corr = pairwise_corr(log_returns(values)[-window:])
+
+    fig = FigureSpec(comparison_layout(theme, window, len(tickers) <= 20), cols=2)
+
+    # WebGL lines keep hundreds of series responsive
+    for i, ticker in enumerate(tickers):
+        fig.add_trace(scattergl(
+            x=closes.index,
+            y=rebased[:, i].astype(np.float32),
+            name=ticker,
+            mode="lines",
+            line=dict(width=1)
+        ), row=1, col=1)
+
+    fig.add_trace(heatmap(
+        z=corr,
+        x=tickers,
+        y=tickers,
+        zmin=-1, zmax=1,
+        colorscale=RDBU,
+        reversescale=True,
+        showscale=True
+    ), row=1, col=2)
+
+    return fig.to_html()
@@ -1,8 +1,13 @@
+import time
+STARTUP_T0 = time.perf_counter()
+
 import sys
 from PyQt5.QtWidgets import QApplication, QStyleFactory
+from PyQt5.QtCore import QTimer
 from ui import StockApp
 from qt_material import apply_stylesheet
 from data import CONFIG_PATH, load_config
+from provider import provider_from_config, set_provider
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -10,10 +15,12 @@ if __name__ == "__main__":
     app.setStyle(QStyleFactory.create("Fusion"))
 
     config = load_config(CONFIG_PATH)
+    set_provider(provider_from_config(config))
 
     apply_stylesheet(app, theme=config.get("theme", "dark_teal.xml"))
 
-    window = StockApp()
+    window = StockApp(startup_t0=STARTUP_T0)
     window.show()
+    QTimer.singleShot(0, window.finish_startup)
 
     sys.exit(app.exec_())
\ No newline at end of file
@@ -0,0 +1,156 @@
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+import json
+import threading
+import time
+import pandas as pd
+from provider import get_provider, normalize_bars, frame_to_csv, frame_from_csv
+
+HISTORY_PATH = Path("history")
+HISTORY_INTERVAL = "1m"
+# Yahoo serves 1m bars for the last 30 days and at most 8 days of them per request
+HISTORY_REACH = pd.Timedelta(days=30)
+CHUNK_SIZE = pd.Timedelta(days=7)
+BAR_SIZE = pd.Timedelta(minutes=1)
+
+class RateLimiter:
+    def __init__(self, per_second):
+        self.spacing = 1.0 / per_second
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        # callers reserve evenly spaced slots, then sleep outside the lock until theirs comes up
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.spacing
+        time.sleep(max(0.0, slot - now))
+
+# one limiter for the whole process: the provider's limit does not care which job is asking
+download_limiter = RateLimiter(2.0)
+_ticker_locks = defaultdict(threading.Lock)
+
+def merge_spans(spans):
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def missing_spans(covered, start, end):
+    gaps = []
+    for span_start, span_end in merge_spans(covered):
+        if span_end <= start:
+            continue
+        if span_start >= end:
+            break
+        if span_start > start:
+            gaps.append((start, span_start))
+        start = max(start, span_end)
+    if start < end:
+        gaps.append((start, end))
+    return gaps
+
+def plan_chunks(spans, size=CHUNK_SIZE):
+    chunks = []
+    for start, end in spans:
+        if end - start < BAR_SIZE:
+            continue
+        while start < end:
+            chunks.append((start, min(start + size, end)))
+            start += size
+    return chunks
+
+def store_paths(ticker, path=HISTORY_PATH):
+    stem = f"{ticker}_{HISTORY_INTERVAL}"
+    return Path(path) / f"{stem}.csv", Path(path) / f"{stem}.json"
+
+def load_covered(ticker, path=HISTORY_PATH):
+    _, spans_path = store_paths(ticker, path)
+    if not spans_path.exists():
+        return []
+    with open(spans_path, "r", encoding="utf-8") as f:
+        return [(pd.Timestamp(start), pd.Timestamp(end)) for start, end in json.load(f)["covered"]]
+
+def load_store(ticker, path=HISTORY_PATH):
+    csv_path, _ = store_paths(ticker, path)
+    df = frame_from_csv(csv_path.read_text(encoding="utf-8")) if csv_path.exists() else pd.DataFrame()
+    return df, load_covered(ticker, path)
+
+def read_history(ticker, path=HISTORY_PATH):
+    # under the ticker's lock, so a save in progress is never read half written
+    with _ticker_locks[ticker]:
+        return load_store(ticker, path)[0]
+
+def save_store(ticker, df, covered, path=HISTORY_PATH):
+    csv_path, spans_path = store_paths(ticker, path)
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+    csv_path.write_text(frame_to_csv(df), encoding="utf-8")
+    with open(spans_path, "w", encoding="utf-8") as f:
+        json.dump({"covered": [[start.isoformat(), end.isoformat()] for start, end in covered]}, f, indent=2)
+
+def history_gaps(ticker, path=HISTORY_PATH, now=None):
+    # holes inside the reachable window (never fetched, or failed); bars since the last run are not a hole
+    now = now or pd.Timestamp.now(tz="UTC")
+    with _ticker_locks[ticker]:
+        covered = load_covered(ticker, path)
+    end = max([span_end for _, span_end in covered], default=now)
+    return missing_spans(covered, (now - HISTORY_REACH).ceil("D"), end)
+
+def fetch_chunk(ticker, start, end):
+    download_limiter.wait()
+    df = get_provider().download(ticker, interval=HISTORY_INTERVAL, start=start, end=end)
+    return normalize_bars(df)
+
+def stitch(stored, chunks):
+    # chunks are applied oldest first; where they overlap, the newest fetch wins
+    frames = [stored] + [df for _, df in sorted(chunks, key=lambda chunk: chunk[0])]
+    frames = [df for df in frames if not df.empty]
+    if not frames:
+        return stored
+    df = pd.concat(frames)
+    return df[~df.index.duplicated(keep="last")].sort_index()
+
+def backfill_history(tickers, workers=4, path=HISTORY_PATH):
+    tickers = list(dict.fromkeys(tickers))
+    now = pd.Timestamp.now(tz="UTC")
+    window_start = (now - HISTORY_REACH).ceil("D")
+    jobs = []
+    for ticker in tickers:
+        with _ticker_locks[ticker]:
+            covered = load_covered(ticker, path)
+        jobs += [(ticker, chunk) for chunk in plan_chunks(missing_spans(covered, window_start, now))]
+
+    # downloads hold no lock, so readers of a ticker's store never wait on the whole job
+    fetched = defaultdict(list)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(fetch_chunk, ticker, *chunk): (ticker, chunk) for ticker, chunk in jobs}
+        for future in as_completed(futures):
+            ticker, (start, end) = futures[future]
+            try:
+                df = future.result()
+            except Exception as e:
+                # left uncovered, so the next run retries just this chunk
+                print(f"Failed to backfill {ticker} {start:%Y-%m-%d %H:%M}-{end:%Y-%m-%d %H:%M}: {e}")
+                continue
+            if end >= now and not df.empty:
+                # the newest bar may still be forming; cover only up to it so it is fetched again
+                end = max(start, df.index[-1])
+            fetched[ticker].append(((start, end), df))
+
+    results = {}
+    for ticker in tickers:
+        # reloaded here, since another job may have saved this ticker while the chunks downloaded
+        with _ticker_locks[ticker]:
+            stored, covered = load_store(ticker, path)
+            chunks = fetched.get(ticker, [])
+            if chunks:
+                stored = stitch(stored, chunks)
+                covered = merge_spans(covered + [span for span, _ in chunks])
+                save_store(ticker, stored, covered, path)
+        results[ticker] = stored
+    return results
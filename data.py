@@ -1,12 +1,24 @@
 from pathlib import Path
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import copy
 import json
-import yfinance as yf
+import os
+import threading
+import time
 import pandas as pd
 from plotly.subplots import make_subplots
-import plotly.graph_objects as go
-import plotly.express as px
+from provider import get_provider, normalize_bars, DAILY_INTERVALS
+from backfill import backfill_history, history_gaps, read_history, download_limiter
+import indicators
+from hotcache import FrameCache, compact_frame
+from figspec import FigureSpec, figure_layout, scatter, candlestick
+from resample import BASE_BARS, default_interval, resample_ohlcv, slice_period, view_base
+from streaming import bars_frame, daily_delta, fold_bars, merge_drains
 
 CONFIG_PATH = Path("config.json")
+PLOTS_PATH = Path("plots")
 
 def load_config(path=CONFIG_PATH):
     if path.exists():
@@ -19,52 +31,278 @@ def load_config(path=CONFIG_PATH):
         "period": "1y",
         "theme": "default",
         "main_indicator": ["sma5", "sma20", "sma60", "sma120", "vwap"],
-        "sub_indicator": "williams_r"
+        "sub_indicator": "williams_r",
+        "intervals": {}
     }
 
 def save_config(path, config):
-    with open(path, 'w', encoding='utf-8') as f:
+    tmp_path = Path(path).with_name(Path(path).name + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
         json.dump(config, f, indent=2)
+    os.replace(tmp_path, path)
 
+# a single worker keeps background writes in submission order
+_config_writer = ThreadPoolExecutor(max_workers=1)
+
+def save_config_async(path, config):
+    return _config_writer.submit(save_config, path, copy.deepcopy(config))
+
+@lru_cache(maxsize=1024)
 def get_ticker_fullname(ticker: str):
-    ticker_obj = yf.Ticker(ticker)
-    full_name = ticker_obj.info.get('longName', ticker_obj.info.get('shortName', ticker))
+    info = get_provider().info(ticker)
+    full_name = info.get('longName', info.get('shortName', ticker))
 
     return full_name
 
-def fetch_market_data(ticker: str, period: str, timezone: str = "Asia/Seoul") -> pd.DataFrame:
-    interval_map = {
-        "1d": "1m", "5d": "1d", "1mo": "1d", "3mo": "1d",
-        "6mo": "1d", "1y": "1d", "5y": "1d"
-    }
-    interval = interval_map.get(period, "1d")
-
-    try:
-        df = yf.download(ticker, period=period, interval=interval, progress=False)
-    except Exception as e:
-        print(f"Failed to download {ticker}: {e}")
-        return pd.DataFrame()
+# canonical UTC base bars, views sliced/resampled from them and their indicator
+# columns, all held compactly in one memory-bounded LRU; zones are applied on top
+_hot_cache = FrameCache()
+_fetch_locks = defaultdict(threading.Lock)
+_prefetcher = ThreadPoolExecutor(max_workers=2)
+# screener and comparison loads queue a whole watchlist behind the rate limit; on their own pool
+# they never hold up the neighbour prefetches that keep arrow-key renders instant
+_loader = ThreadPoolExecutor(max_workers=2)
+_prefetching = []
+# streamed minute bars wait here per cached base series until a view of it is built, so a drain
+# costs the GUI thread a list append per ticker however long the watchlist is
+_live_pending = {}
+_live_lock = threading.Lock()
+LIVE_COMPACT = 64
+
+def hot_cache_stats():
+    return _hot_cache.stats()
+
+def has_cached_bars(ticker, period, interval=None):
+    base = view_base(period, interval or default_interval(period))
+    return _hot_cache.peek(("bars", ticker, base)) is not None
+
+def to_timezone(df, timezone, interval):
+    if isinstance(df.index, pd.DatetimeIndex) and df.index.tz is not None:
+        # daily and longer bars sit at UTC midnight of their date and keep that date in every zone
+        if interval in DAILY_INTERVALS:
+            return df.tz_localize(None)
+        return df.tz_convert(timezone)
+    return df
 
-    if isinstance(df.columns, pd.MultiIndex):
-        df.columns = [col[0] for col in df.columns]
+def fetch_base_bars(ticker: str, base: str, refresh: bool = True, max_age: float = None) -> pd.DataFrame:
+    key = ("bars", ticker, base)
+    # one download per key at a time; a waiting caller then finds it cached
+    with _fetch_locks[key]:
+        if not refresh:
+            df = _hot_cache.get(key, max_age)
+            if df is not None:
+                return df
+
+        period, interval = BASE_BARS[base]
+
+        if base == "history":
+            # the backfill runs on its own worker and replaces these bars when it is done; until
+            # then the chart shows what is cached, what is stored, or else the last five days
+            queue_history(ticker)
+            df = _hot_cache.peek(key)
+            if df is not None:
+                return df
+            df = read_history(ticker)
+            if df.empty:
+                df = fetch_base_bars(ticker, "intraday", refresh=False)
+            if not df.empty:
+                df = compact_frame(df)
+                discard_views(ticker, base)
+                _hot_cache.put(key, df)
+            return df
 
-    if isinstance(df.index, pd.DatetimeIndex):
-        if df.index.tz is None:
-            df.index = df.index.tz_localize('UTC').tz_convert(timezone)
-        else:
-            df.index = df.index.tz_convert(timezone)
+        try:
+            df = normalize_bars(get_provider().download(ticker, period=period, interval=interval), interval)
+        except Exception as e:
+            print(f"Failed to download {ticker}: {e}")
+            return pd.DataFrame()
 
-    return df
+        if not df.empty:
+            df = compact_frame(df)
+            discard_views(ticker, base)
+            _hot_cache.put(key, df)
+            # the download already holds the trades streamed so far
+            with _live_lock:
+                _live_pending.pop(key, None)
+        return df
+
+def discard_views(ticker, base):
+    _hot_cache.discard_where(lambda k: k[0] in ("view", "ind") and k[1] == ticker and view_base(k[2], k[3]) == base)
+
+def queue_live_bars(ticker, bars):
+    with _live_lock:
+        for base in BASE_BARS:
+            key = ("bars", ticker, base)
+            if _hot_cache.peek(key) is None:
+                continue
+            pending = _live_pending.setdefault(key, [])
+            pending.append(bars)
+            if len(pending) >= LIVE_COMPACT:
+                pending[:] = [merge_drains(pending)]
+
+def merge_live_bars(ticker, base):
+    # folding rebuilds the whole base series, so it happens once per view build rather than per drain
+    key = ("bars", ticker, base)
+    with _fetch_locks[key]:
+        with _live_lock:
+            pending = _live_pending.pop(key, None)
+        bars = _hot_cache.peek(key)
+        if not pending or bars is None or bars.empty:
+            return
+        delta = bars_frame(merge_drains(pending))
+        rows = daily_delta(delta, bars.index[-1]) if base == "daily" else delta
+        discard_views(ticker, base)
+        _hot_cache.put(key, compact_frame(fold_bars(bars, rows)), _hot_cache.stamp(key))
+
+def live_change(ticker, bars):
+    # last streamed price and its change from the close before the trade's date, for the watchlist
+    minute = max(bars)
+    price = float(bars[minute]["Close"])
+    daily = _hot_cache.peek(("bars", ticker, "daily"))
+    if daily is None:
+        return price, None
+    pos = daily.index.searchsorted(minute.normalize())
+    if pos == 0:
+        return price, None
+    return price, (price / float(daily.iat[pos - 1, daily.columns.get_loc("Close")]) - 1) * 100
+
+def cached_frames(tickers, base="daily"):
+    frames = {ticker: _hot_cache.peek(("bars", ticker, base)) for ticker in tickers}
+    return {ticker: df for ticker, df in frames.items() if df is not None}
+
+def indicator_columns(df, name):
+    if name.startswith("sma"):
+        period = int(name[3:])
+        return {f"SMA{period}": indicators.sma(df, period)}
+    if name == "vwap":
+        return {"VWAP": indicators.vwap(df)}
+    if name.startswith("kama"):
+        period = int(name[4:])
+        return {f"KAMA{period}": indicators.kama(df, period=period)}
+    if name == "williams_r":
+        return {"Williams %R": indicators.williams_r(df)}
+    if name == "mfi":
+        return {"MFI": indicators.mfi(df)}
+    if name == "stoch_rsi":
+        k, d = indicators.stoch_rsi(df)
+        return {"StochRSI_K": k, "StochRSI_D": d}
+    if name == "fisher":
+        fisher, signal = indicators.fisher_transform(df)
+        return {"Fisher": fisher, "Fisher_Signal": signal}
+    return {}
+
+def fetch_market_data(ticker: str, period: str, refresh: bool = True, interval: str = None,
+                      max_age: float = None, indicator_names=()) -> pd.DataFrame:
+    interval = interval or default_interval(period)
+    base = view_base(period, interval)
+    view_key = ("view", ticker, period, interval)
+
+    merge_live_bars(ticker, base)
+    df = None if refresh else _hot_cache.get(view_key, max_age)
+    if df is None:
+        bars = fetch_base_bars(ticker, base, refresh, max_age)
+        df = resample_ohlcv(slice_period(bars, period), interval, bars)
+        if df.empty:
+            return df
+        _hot_cache.put(view_key, df, _hot_cache.stamp(("bars", ticker, base)))
+
+    if not indicator_names:
+        return df
+    columns = [df]
+    for name in indicator_names:
+        ind_key = ("ind", ticker, period, interval, name)
+        computed = _hot_cache.peek(ind_key)
+        if computed is None:
+            computed = compact_frame(pd.DataFrame(indicator_columns(df, name), index=df.index))
+            _hot_cache.put(ind_key, computed, _hot_cache.stamp(view_key))
+        columns.append(computed)
+    return pd.concat(columns, axis=1)
+
+def prefetch_market_data(requests, indicator_names=()):
+    # newer requests win: anything still queued from the last call is dropped
+    for future in _prefetching:
+        future.cancel()
+    _prefetching[:] = [
+        _prefetcher.submit(fetch_market_data, ticker, period, False, interval, None, indicator_names)
+        for ticker, period, interval in requests
+    ]
+
+def load_market_data(ticker, period, interval=None, refresh=False, max_age=None):
+    # background loads share the provider's rate limit; fresh cached bars skip the wait
+    stamp = _hot_cache.stamp(("bars", ticker, view_base(period, interval or default_interval(period))))
+    if refresh or stamp is None or (max_age is not None and time.time() - stamp > max_age):
+        download_limiter.wait()
+    return fetch_market_data(ticker, period, refresh, interval, max_age)
+
+def load_in_background(requests, refresh=False, max_age=None):
+    # unlike prefetch_market_data these are never dropped by a later call; callers wait on them
+    return [
+        _loader.submit(load_market_data, ticker, period, interval, refresh, max_age)
+        for ticker, period, interval in requests
+    ]
+
+def load_chart(ticker, period, interval, indicator_names=()):
+    # what a render would otherwise download on the GUI thread: fresh bars and the name in the title
+    fetch_market_data(ticker, period, True, interval, None, indicator_names)
+    get_ticker_fullname(ticker)
+
+def load_chart_async(ticker, period, interval, indicator_names=()):
+    return _loader.submit(load_chart, ticker, period, interval, indicator_names)
+
+# one watchlist backfill at a time; it spreads its own chunks over a rate-limited pool
+_backfiller = ThreadPoolExecutor(max_workers=1)
+_history_queued = {}
+_history_lock = threading.Lock()
+
+def store_history(tickers):
+    frames = backfill_history(tickers)
+    for ticker, df in frames.items():
+        key = ("bars", ticker, "history")
+        with _fetch_locks[key]:
+            discard_views(ticker, "history")
+            if not df.empty:
+                _hot_cache.put(key, compact_frame(df))
+    return {ticker: (len(df), history_gaps(ticker)) for ticker, df in frames.items()}
+
+def backfill_watchlist(tickers):
+    return _backfiller.submit(store_history, tickers)
+
+def queue_history(ticker):
+    # at most one chart-driven backfill per ticker waits on the worker
+    with _history_lock:
+        future = _history_queued.get(ticker)
+        if future is None or future.done():
+            future = _history_queued[ticker] = backfill_watchlist([ticker])
+        return future
+
+def pending_history(ticker):
+    with _history_lock:
+        future = _history_queued.get(ticker)
+    return None if future is None or future.done() else future
+
+def thumbnail_path(ticker, timezone="Asia/Seoul"):
+    return PLOTS_PATH / f'{ticker}__{timezone.replace("/", "-")}.png'
+
+def find_thumbnail(ticker, timezone="Asia/Seoul"):
+    thumb_path = thumbnail_path(ticker, timezone)
+    if thumb_path.exists():
+        return thumb_path
+    # another zone's image is a fine stand-in until this one is rendered
+    return next(PLOTS_PATH.glob(f'{ticker}__*.png'), None)
+
+def chart_cache_path(ticker):
+    return PLOTS_PATH / f'{ticker}.html'
 
 def create_thumbnail(ticker, timezone="Asia/Seoul", force_update=False):
-    plots_dir = Path('plots')
-    plots_dir.mkdir(exist_ok=True)
-    thumb_path = plots_dir / f'{ticker}.png'
+    PLOTS_PATH.mkdir(exist_ok=True)
+    thumb_path = thumbnail_path(ticker, timezone)
 
     if force_update or not thumb_path.exists():
-        df = fetch_market_data(ticker, "5y", timezone)
+        df = fetch_market_data(ticker, "5y", refresh=force_update)
         if not df.empty:
-            df_plot = df.reset_index()
+            import plotly.express as px
+
+            df_plot = to_timezone(df, timezone, default_interval("5y")).reset_index()
             fig = px.line(df_plot, x=df_plot.columns[0], y="Close")
             fig.update_layout(
                 margin=dict(l=0, r=0, t=0, b=0),
@@ -76,6 +314,12 @@ def create_thumbnail(ticker, timezone="Asia/Seoul", force_update=False):
 
     return str(thumb_path)
 
+# kaleido and the download both stay off the GUI thread, one thumbnail at a time
+_thumbnailer = ThreadPoolExecutor(max_workers=1)
+
+def create_thumbnail_async(ticker, timezone="Asia/Seoul", force_update=False):
+    return _thumbnailer.submit(lambda: create_thumbnail(ticker, timezone, force_update))
+
 def calculate_price_changes(df):
     if df.empty:
         return [None] * 5
@@ -116,16 +360,21 @@ def init_figure(ticker, sub_indicator, theme):
     fig.update_yaxes(autorange=True, fixedrange=False)
     return fig
 
+@lru_cache(maxsize=256)
+def base_layout(ticker, sub_indicator, theme):
+    # subplot geometry, titles and template only change with these inputs
+    return figure_layout(init_figure(ticker, sub_indicator, theme))
+
 def price_trace(df, chart_type, date_col):
     if chart_type == "line":
-        return go.Scatter(
+        return scatter(
             x=df[date_col],
             y=df["Close"],
             name="Close",
             mode="lines"
         )
     else:
-        return go.Candlestick(
+        return candlestick(
             x=df[date_col],
             open=df["Open"], high=df["High"],
             low=df["Low"], close=df["Close"],
@@ -134,8 +383,9 @@ def price_trace(df, chart_type, date_col):
 
 def add_sma(fig, df, periods, date_col):
     for p in periods:
-        df[f"SMA{p}"] = df["Close"].rolling(p).mean()
-        fig.add_trace(go.Scatter(
+        if f"SMA{p}" not in df:
+            df[f"SMA{p}"] = indicators.sma(df, p)
+        fig.add_trace(scatter(
             x=df[date_col],
             y=df[f"SMA{p}"],
             mode="lines",
@@ -144,41 +394,23 @@ def add_sma(fig, df, periods, date_col):
         ), row=1, col=1)
 
 def add_vwap(fig, df, date_col):
-    vwap = (df["Volume"] * (df["High"] + df["Low"] + df["Close"]) / 3).cumsum() / df["Volume"].cumsum()
-    fig.add_trace(go.Scatter(
+    if "VWAP" not in df:
+        df["VWAP"] = indicators.vwap(df)
+    fig.add_trace(scatter(
         x=df[date_col],
-        y=vwap,
+        y=df["VWAP"],
         name="VWAP",
         mode="lines",
         line=dict(color="purple", width=1)
     ), row=1, col=1)
 
 def add_kama(fig, df, date_col, period=10, fast_period=2, slow_period=30):
-    import numpy as np
-
-    change = df["Close"].diff(period).abs()
-    volatility = df["Close"].diff().abs().rolling(period).sum()
-    er = (change / volatility.replace(0, np.nan)).fillna(0)
-
-    fast_sc = 2.0 / (fast_period + 1)
-    slow_sc = 2.0 / (slow_period + 1)
-    sc = (er * (fast_sc - slow_sc) + slow_sc) ** 2
+    if f"KAMA{period}" not in df:
+        df[f"KAMA{period}"] = indicators.kama(df, period, fast_period, slow_period)
 
-    kama = [float("nan")] * len(df)
-    
-    start_idx = period
-    if len(df) <= period:
-        start_idx = len(df) - 1
-    kama[start_idx] = df["Close"].iloc[start_idx]
-
-    for i in range(start_idx + 1, len(df)):
-        kama[i] = kama[i - 1] + sc.iloc[i] * (df["Close"].iloc[i] - kama[i - 1])
-
-    df["KAMA"] = kama
-
-    fig.add_trace(go.Scatter(
+    fig.add_trace(scatter(
         x=df[date_col],
-        y=df["KAMA"],
+        y=df[f"KAMA{period}"],
         mode="lines",
         name=f"KAMA({period})",
         line=dict(width=1.5)
@@ -186,11 +418,10 @@ def add_kama(fig, df, date_col, period=10, fast_period=2, slow_period=30):
 
 
 def add_williams_r(fig, df, date_col, period=14):
-    high = df["High"].rolling(period).max()
-    low = df["Low"].rolling(period).min()
-    df["Williams %R"] = (high - df["Close"]) / (high - low) * -100
+    if "Williams %R" not in df:
+        df["Williams %R"] = indicators.williams_r(df, period)
 
-    fig.add_trace(go.Scatter(
+    fig.add_trace(scatter(
         x=df[date_col],
         y=df["Williams %R"],
         name="Williams %R",
@@ -210,17 +441,10 @@ def add_williams_r(fig, df, date_col, period=14):
         )
 
 def add_mfi(fig, df, date_col, period=14):
-    tp = (df["High"] + df["Low"] + df["Close"]) / 3
-    mf = tp * df["Volume"]
-    direction = tp.diff() > 0
-
-    pos_mf = mf.where(direction, 0).rolling(period).sum()
-    neg_mf = mf.where(~direction, 0).rolling(period).sum()
+    if "MFI" not in df:
+        df["MFI"] = indicators.mfi(df, period)
 
-    mfi = 100 - (100 / (1 + (pos_mf / neg_mf)))
-    df["MFI"] = mfi
-
-    fig.add_trace(go.Scatter(
+    fig.add_trace(scatter(
         x=df[date_col],
         y=df["MFI"],
         name="MFI",
@@ -240,27 +464,10 @@ def add_mfi(fig, df, date_col, period=14):
         )
 
 def add_stoch_rsi(fig, df, date_col, period=14, smooth_k=3, smooth_d=3):
-    delta = df["Close"].diff()
-    gain = delta.where(delta > 0, 0)
-    loss = -delta.where(delta < 0, 0)
-
-    avg_gain = gain.rolling(period).mean()
-    avg_loss = loss.rolling(period).mean()
-
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
+    if "StochRSI_K" not in df:
+        df["StochRSI_K"], df["StochRSI_D"] = indicators.stoch_rsi(df, period, smooth_k, smooth_d)
 
-    min_rsi = rsi.rolling(period).min()
-    max_rsi = rsi.rolling(period).max()
-
-    stoch_rsi = (rsi - min_rsi) / (max_rsi - min_rsi)
-    k = stoch_rsi.rolling(smooth_k).mean() * 100
-    d = k.rolling(smooth_d).mean()
-
-    df["StochRSI_K"] = k
-    df["StochRSI_D"] = d
-
-    fig.add_trace(go.Scatter(
+    fig.add_trace(scatter(
         x=df[date_col],
         y=df["StochRSI_K"],
         name="%K",
@@ -268,7 +475,7 @@ def add_stoch_rsi(fig, df, date_col, period=14, smooth_k=3, smooth_d=3):
         line=dict(color="blue", width=1)
     ), row=2, col=1)
 
-    fig.add_trace(go.Scatter(
+    fig.add_trace(scatter(
         x=df[date_col],
         y=df["StochRSI_D"],
         name="%D",
@@ -289,22 +496,10 @@ def add_stoch_rsi(fig, df, date_col, period=14, smooth_k=3, smooth_d=3):
 
 
 def add_fisher_transform(fig, df, date_col, period=10):
-    import numpy as np
-
-    price = (df["High"] + df["Low"]) / 2
-    hh = price.rolling(period).max()
-    ll = price.rolling(period).min()
-
-    value = 2 * (price - ll) / (hh - ll) - 1
-    value = value.clip(-0.999, 0.999)
-
-    fisher = 0.5 * np.log((1 + value) / (1 - value))
-    signal = fisher.ewm(span=5, adjust=False).mean()
-
-    df["Fisher"] = fisher
-    df["Fisher_Signal"] = signal
+    if "Fisher" not in df:
+        df["Fisher"], df["Fisher_Signal"] = indicators.fisher_transform(df, period)
 
-    fig.add_trace(go.Scatter(
+    fig.add_trace(scatter(
         x=df[date_col],
         y=df["Fisher"],
         name="Fisher",
@@ -312,7 +507,7 @@ def add_fisher_transform(fig, df, date_col, period=10):
         line=dict(color="cyan", width=1.5)
     ), row=2, col=1)
 
-    fig.add_trace(go.Scatter(
+    fig.add_trace(scatter(
         x=df[date_col],
         y=df["Fisher_Signal"],
         name="Fisher Signal",
@@ -332,13 +527,17 @@ def add_fisher_transform(fig, df, date_col, period=10):
         )
 
 
-def create_plot_html(df, ticker, chart_type="line", theme="default", main_indicator=[], sub_indicator="williams_r"):
+def create_plot_html(df, ticker, chart_type="line", theme="default", main_indicator=[], sub_indicator="williams_r", timezone="UTC", interval="1d"):
     if df.empty:
         return "<h2>No data available.</h2>"
+    return create_plot_figure(df, ticker, chart_type, theme, main_indicator, sub_indicator, timezone, interval).to_html()
 
-    df = df.reset_index()
+def create_plot_figure(df, ticker, chart_type="line", theme="default", main_indicator=[], sub_indicator="williams_r", timezone="UTC", interval="1d"):
+    df = to_timezone(df, timezone, interval).reset_index()
     date_col = df.columns[0]
-    fig = init_figure(ticker, sub_indicator, theme)
+    fig = FigureSpec(base_layout(ticker, sub_indicator, theme))
+    # live updates redraw through Plotly.react, which keeps the user's zoom while this stays the same
+    fig.layout["uirevision"] = ticker
 
     fig.add_trace(price_trace(df, chart_type, date_col), row=1, col=1)
 
@@ -361,4 +560,4 @@ def create_plot_html(df, ticker, chart_type="line", theme="default", main_indica
     elif sub_indicator == "fisher":
         add_fisher_transform(fig, df, date_col)
 
-    return fig.to_html(include_plotlyjs='cdn')
\ No newline at end of file
+    return fig
\ No newline at end of file
@@ -0,0 +1,147 @@
+import base64
+import json
+import uuid
+import numpy as np
+import pandas as pd
+from plotly.offline import get_plotlyjs_version
+
+ARRAY_KEYS = ("x", "y", "z", "open", "high", "low", "close")
+
+def trace(kind, **props):
+    return {"type": kind, **props}
+
+def scatter(**props):
+    return trace("scatter", **props)
+
+def scattergl(**props):
+    return trace("scattergl", **props)
+
+def candlestick(**props):
+    return trace("candlestick", **props)
+
+def heatmap(**props):
+    return trace("heatmap", **props)
+
+def date_strings(values):
+    # plotly.js ignores UTC offsets, so wall-clock strings draw exactly like the offset-suffixed ones
+    index = pd.DatetimeIndex(values)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return np.datetime_as_string(index.to_numpy(), unit="s").tolist()
+
+def date_string(value):
+    value = pd.Timestamp(value)
+    if value.tz is not None:
+        value = value.tz_localize(None)
+    return value.isoformat()
+
+def typed_array(values):
+    # plotly.js >= 2.28 decodes these base64 typed arrays without a JSON number per point
+    array = np.ascontiguousarray(values)
+    if array.dtype != np.float32:
+        array = array.astype(np.float64)
+    dtype = "f4" if array.dtype == np.float32 else "f8"
+    return {"dtype": dtype, "bdata": base64.b64encode(array.tobytes()).decode("ascii")}
+
+def encode_array(values):
+    if isinstance(values, (pd.Series, pd.Index, np.ndarray)):
+        if values.dtype.kind == "M":
+            return date_strings(values)
+        if values.dtype.kind in "fiu":
+            if values.ndim == 1:
+                return typed_array(values)
+            # 2-D grids (heatmaps) stay nested lists with gaps as null
+            grid = np.asarray(values, dtype=float)
+            return np.where(np.isnan(grid), None, grid).tolist()
+        return np.asarray(values).tolist()
+    return values
+
+def axis_ids(index):
+    return ("x", "y") if index == 1 else (f"x{index}", f"y{index}")
+
+class FigureSpec:
+    def __init__(self, layout, cols=1):
+        self.data = []
+        self.layout = dict(layout)
+        self.layout["shapes"] = list(self.layout.get("shapes", []))
+        self.cols = cols
+
+    def subplot(self, row, col):
+        return axis_ids((row - 1) * self.cols + col)
+
+    def add_trace(self, spec, row=None, col=None):
+        spec = {key: encode_array(value) if key in ARRAY_KEYS else value for key, value in spec.items()}
+        if row is not None:
+            spec["xaxis"], spec["yaxis"] = self.subplot(row, col)
+        self.data.append(spec)
+
+    def add_shape(self, row=None, col=None, **shape):
+        for key in ("x0", "x1"):
+            if isinstance(shape.get(key), (pd.Timestamp, np.datetime64)):
+                shape[key] = date_string(shape[key])
+        if row is not None:
+            shape["xref"], shape["yref"] = self.subplot(row, col)
+        self.layout["shapes"].append(shape)
+
+    def to_json(self):
+        return json.dumps({"data": self.data, "layout": self.layout}, separators=(",", ":"), default=json_default)
+
+    def shared_x(self):
+        # every trace of a chart usually repeats the same date axis; ship each distinct one once
+        shared, refs, data = [], [], []
+        for spec in self.data:
+            x = spec.get("x")
+            if isinstance(x, list):
+                ref = next((i for i, seen in enumerate(shared) if seen == x), None)
+                if ref is None:
+                    ref = len(shared)
+                    shared.append(x)
+                refs.append(ref)
+                spec = {key: value for key, value in spec.items() if key != "x"}
+            else:
+                refs.append(-1)
+            data.append(spec)
+        return shared, refs, data
+
+    def figure_script(self):
+        shared, refs, data = self.shared_x()
+        dumps = lambda value: json.dumps(value, separators=(",", ":"), default=json_default)
+        return (
+            f"var figure = {{\"data\":{dumps(data)},\"layout\":{dumps(self.layout)}}};\n"
+            f"var sharedX = {dumps(shared)};\n"
+            f"{dumps(refs)}.forEach(function (ref, i) {{ if (ref >= 0) figure.data[i].x = sharedX[ref]; }});\n"
+        )
+
+    def to_html(self):
+        div_id = str(uuid.uuid4())
+        return (
+            "<html>\n<head><meta charset=\"utf-8\" /></head>\n<body>\n<div>\n"
+            f"<script charset=\"utf-8\" src=\"https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js\"></script>\n"
+            f"<div id=\"{div_id}\" class=\"plotly-graph-div\" style=\"height:100%; width:100%;\"></div>\n"
+            "<script type=\"text/javascript\">\n"
+            f"{self.figure_script()}"
+            f"Plotly.newPlot(\"{div_id}\", figure.data, figure.layout, {{\"responsive\": true}});\n"
+            "</script>\n</div>\n</body>\n</html>"
+        )
+
+    def to_react(self):
+        # redraws the chart already on the page in place, for pages made by to_html
+        return (
+            "(function () {\n"
+            f"{self.figure_script()}"
+            "Plotly.react(document.querySelector(\".plotly-graph-div\"), figure.data, figure.layout);\n"
+            "})();"
+        )
+
+def json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return date_string(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+def figure_layout(fig):
+    # plain-dict layout of a plotly figure, built once and reused for every render
+    return json.loads(fig.to_json())["layout"]
@@ -0,0 +1,73 @@
+from collections import OrderedDict
+import threading
+import time
+import numpy as np
+
+def frame_nbytes(df):
+    return int(df.memory_usage(index=True, deep=False).sum())
+
+def compact_frame(df):
+    # float32 halves the footprint; the precision is far below what a chart can show
+    floats = df.select_dtypes(include=[np.floating, np.integer]).columns
+    return df.astype({col: np.float32 for col in floats})
+
+class FrameCache:
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.RLock()
+
+    def get(self, key, max_age=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or (max_age is not None and time.time() - entry[1] > max_age):
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def peek(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            return None if entry is None else entry[0]
+
+    def stamp(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            return None if entry is None else entry[1]
+
+    def put(self, key, frame, stamp=None):
+        size = frame_nbytes(frame)
+        with self.lock:
+            self.discard(key)
+            self.entries[key] = (frame, stamp if stamp is not None else time.time(), size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes and len(self.entries) > 1:
+                _, (_, _, evicted) = self.entries.popitem(last=False)
+                self.nbytes -= evicted
+
+    def discard(self, key):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.nbytes -= entry[2]
+
+    def discard_where(self, predicate):
+        with self.lock:
+            for key in [key for key in self.entries if predicate(key)]:
+                self.discard(key)
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.nbytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+def sma(df, period):
+    return df["Close"].rolling(period).mean()
+
+def vwap(df):
+    return (df["Volume"] * (df["High"] + df["Low"] + df["Close"]) / 3).cumsum() / df["Volume"].cumsum()
+
+def kama(df, period=10, fast_period=2, slow_period=30):
+    close = df["Close"]
+    change = close.diff(period).abs()
+    volatility = close.diff().abs().rolling(period).sum()
+    er = (change / volatility.replace(0, np.nan)).fillna(0)
+
+    fast_sc = 2.0 / (fast_period + 1)
+    slow_sc = 2.0 / (slow_period + 1)
+    sc = ((er * (fast_sc - slow_sc) + slow_sc) ** 2).to_numpy(dtype=float)
+
+    # works on a single close series or a wide frame with one column per ticker
+    prices = close.to_numpy(dtype=float)
+    values = np.full(prices.shape, np.nan)
+
+    if len(prices):
+        rows = len(prices)
+        grid, steps, out = prices.reshape(rows, -1), sc.reshape(rows, -1), values.reshape(rows, -1)
+        # each column is seeded `period` bars after its own first price, since wide panels are NaN-padded at the head
+        valid = ~np.isnan(grid)
+        first = np.where(valid.any(axis=0), valid.argmax(axis=0), rows)
+        start = np.minimum(first + period, rows - 1)
+        cols = np.flatnonzero(first < rows)
+        out[start[cols], cols] = grid[start[cols], cols]
+
+        # the recurrence is inherently sequential in time; arrays keep each step cheap
+        for i in range(start.min() + 1, rows):
+            step = out[i - 1] + steps[i] * (grid[i] - out[i - 1])
+            out[i] = np.where(i > start, step, out[i])
+
+    if values.ndim == 1:
+        return pd.Series(values, index=close.index)
+    return pd.DataFrame(values, index=close.index, columns=close.columns)
+
+def williams_r(df, period=14):
+    high = df["High"].rolling(period).max()
+    low = df["Low"].rolling(period).min()
+    return (high - df["Close"]) / (high - low) * -100
+
+def mfi(df, period=14):
+    tp = (df["High"] + df["Low"] + df["Close"]) / 3
+    mf = tp * df["Volume"]
+    direction = tp.diff() > 0
+
+    pos_mf = mf.where(direction, 0).rolling(period).sum()
+    neg_mf = mf.where(~direction, 0).rolling(period).sum()
+
+    return 100 - (100 / (1 + (pos_mf / neg_mf)))
+
+def stoch_rsi(df, period=14, smooth_k=3, smooth_d=3):
+    delta = df["Close"].diff()
+    gain = delta.where(delta > 0, 0)
+    loss = -delta.where(delta < 0, 0)
+
+    avg_gain = gain.rolling(period).mean()
+    avg_loss = loss.rolling(period).mean()
+
+    rs = avg_gain / avg_loss
+    rsi = 100 - (100 / (1 + rs))
+
+    min_rsi = rsi.rolling(period).min()
+    max_rsi = rsi.rolling(period).max()
+
+    stoch = (rsi - min_rsi) / (max_rsi - min_rsi)
+    k = stoch.rolling(smooth_k).mean() * 100
+    d = k.rolling(smooth_d).mean()
+    return k, d
+
+def fisher_transform(df, period=10):
+    price = (df["High"] + df["Low"]) / 2
+    hh = price.rolling(period).max()
+    ll = price.rolling(period).min()
+
+    value = 2 * (price - ll) / (hh - ll) - 1
+    value = value.clip(-0.999, 0.999)
+
+    fisher = 0.5 * np.log((1 + value) / (1 - value))
+    signal = fisher.ewm(span=5, adjust=False).mean()
+    return fisher, signal
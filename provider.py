@@ -0,0 +1,269 @@
+from abc import ABC, abstractmethod
+from pathlib import Path
+import io
+import json
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlencode, urlparse, parse_qs
+from urllib.request import urlopen
+import pandas as pd
+
+RECORDINGS_PATH = Path("recordings")
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+DAILY_INTERVALS = ("1d", "5d", "1wk", "1mo", "3mo")
+
+class MarketDataProvider(ABC):
+    name = "base"
+
+    @abstractmethod
+    def download(self, ticker, period=None, interval="1d", start=None, end=None):
+        pass
+
+    @abstractmethod
+    def info(self, ticker):
+        pass
+
+class YFinanceProvider(MarketDataProvider):
+    name = "live"
+
+    def download(self, ticker, period=None, interval="1d", start=None, end=None):
+        import yfinance as yf
+
+        # Ticker.history keeps no shared state, so prefetch threads can call it concurrently
+        history = yf.Ticker(ticker).history
+        if start is not None or end is not None:
+            df = history(start=start, end=end, interval=interval)
+        else:
+            df = history(period=period, interval=interval)
+        return df[[col for col in OHLCV_COLUMNS if col in df.columns]]
+
+    def info(self, ticker):
+        import yfinance as yf
+
+        return yf.Ticker(ticker).info
+
+def record_key(ticker, period=None, interval="1d", start=None, end=None):
+    if start is not None or end is not None:
+        span = f"{pd.Timestamp(start):%Y%m%d%H%M}-{pd.Timestamp(end):%Y%m%d%H%M}"
+    else:
+        span = period
+    raw = f"{ticker}_{span}_{interval}"
+    return re.sub(r"[^A-Za-z0-9._=-]", "-", raw)
+
+def trading_dates(index):
+    # daily bars are dates, not instants: Ticker.history stamps them at exchange-local midnight,
+    # which in UTC falls on the previous day east of Greenwich
+    if index.tz is not None and str(index.tz) != "UTC":
+        return index.tz_localize(None).normalize()
+    # already in UTC (replayed or served frames): the nearest midnight is the exchange's date
+    return (index.tz_localize(None) if index.tz is not None else index).round("D")
+
+def normalize_bars(df, interval=None):
+    # flat OHLCV columns on a UTC index, whatever the backend returned
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = [col[0] for col in df.columns]
+    if isinstance(df.index, pd.DatetimeIndex):
+        if interval in DAILY_INTERVALS:
+            df.index = trading_dates(df.index)
+        if df.index.tz is None:
+            df.index = df.index.tz_localize("UTC")
+        else:
+            df.index = df.index.tz_convert("UTC")
+    return df
+
+def frame_to_csv(df):
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.copy()
+        df.columns = [col[0] for col in df.columns]
+    return df.to_csv()
+
+def frame_from_csv(text):
+    df = pd.read_csv(io.StringIO(text), index_col=0)
+    if not df.empty:
+        df.index = pd.to_datetime(df.index, utc=True)
+    return df
+
+class RecordingProvider(MarketDataProvider):
+    name = "record"
+
+    def __init__(self, inner, path=RECORDINGS_PATH):
+        self.inner = inner
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def download(self, ticker, period=None, interval="1d", start=None, end=None):
+        df = self.inner.download(ticker, period=period, interval=interval, start=start, end=end)
+        key = record_key(ticker, period, interval, start, end)
+        (self.path / f"{key}.csv").write_text(frame_to_csv(df), encoding="utf-8")
+        return df
+
+    def info(self, ticker):
+        info = self.inner.info(ticker)
+        key = record_key(ticker, "info", "none")
+        with open(self.path / f"{key}.json", "w", encoding="utf-8") as f:
+            json.dump(info, f, indent=2, default=str)
+        return info
+
+class ReplayProvider(MarketDataProvider):
+    name = "replay"
+
+    def __init__(self, path=RECORDINGS_PATH, latency=0.0, jitter=0.0):
+        self.path = Path(path)
+        self.latency = latency
+        self.jitter = jitter
+
+    def _sleep(self, key):
+        if self.latency or self.jitter:
+            # deterministic per key so repeated benchmark runs see the same delays
+            spread = (zlib.crc32(key.encode()) % 1000) / 1000.0 if self.jitter else 0.0
+            time.sleep(self.latency + spread * self.jitter)
+
+    def download(self, ticker, period=None, interval="1d", start=None, end=None):
+        key = record_key(ticker, period, interval, start, end)
+        self._sleep(key)
+        csv_path = self.path / f"{key}.csv"
+        if csv_path.exists():
+            return frame_from_csv(csv_path.read_text(encoding="utf-8"))
+        if start is not None and end is not None:
+            # backfill ranges end at the time they were asked for, so they never repeat a key;
+            # they are cut from everything recorded for the ticker at this interval instead
+            df = self.recorded_bars(ticker, interval)
+            if df is not None:
+                return df[(df.index >= pd.Timestamp(start)) & (df.index < pd.Timestamp(end))]
+        raise FileNotFoundError(f"No recording for {key} in {self.path}")
+
+    def recorded_bars(self, ticker, interval):
+        name, _, suffix = record_key(ticker, "", interval).partition("__")
+        paths = [path for path in self.path.glob(f"{name}_*_{suffix}.csv") if path.stem[len(name) + 1:].count("_") == 1]
+        if not paths:
+            return None
+        # newer recordings win where they overlap
+        frames = [frame_from_csv(path.read_text(encoding="utf-8")) for path in sorted(paths, key=lambda path: path.stat().st_mtime)]
+        df = pd.concat([df for df in frames if not df.empty] or frames)
+        return df[~df.index.duplicated(keep="last")].sort_index()
+
+    def info(self, ticker):
+        key = record_key(ticker, "info", "none")
+        self._sleep(key)
+        json_path = self.path / f"{key}.json"
+        if not json_path.exists():
+            return {}
+        with open(json_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+class HttpProvider(MarketDataProvider):
+    name = "http"
+
+    def __init__(self, base_url="http://127.0.0.1:8765", timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def _get(self, route, params):
+        query = urlencode({k: v for k, v in params.items() if v is not None})
+        with urlopen(f"{self.base_url}/{route}?{query}", timeout=self.timeout) as resp:
+            return resp.read().decode("utf-8")
+
+    def download(self, ticker, period=None, interval="1d", start=None, end=None):
+        params = {"ticker": ticker, "period": period, "interval": interval}
+        if (start is None) != (end is None):
+            raise ValueError("start and end must be given together")
+        if start is not None:
+            params["start"] = pd.Timestamp(start).isoformat()
+            params["end"] = pd.Timestamp(end).isoformat()
+        return frame_from_csv(self._get("download", params))
+
+    def info(self, ticker):
+        return json.loads(self._get("info", {"ticker": ticker}))
+
+def make_handler(backend):
+    class ProviderRequestHandler(BaseHTTPRequestHandler):
+        def _reply(self, status, body, content_type):
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            ticker = params.get("ticker")
+            if not ticker:
+                self._reply(400, "missing ticker", "text/plain")
+                return
+            if ("start" in params) != ("end" in params):
+                self._reply(400, "start and end must be given together", "text/plain")
+                return
+            try:
+                if url.path == "/download":
+                    df = backend.download(
+                        ticker,
+                        period=params.get("period"),
+                        interval=params.get("interval", "1d"),
+                        start=params.get("start"),
+                        end=params.get("end")
+                    )
+                    self._reply(200, frame_to_csv(df), "text/csv")
+                elif url.path == "/info":
+                    self._reply(200, json.dumps(backend.info(ticker), default=str), "application/json")
+                else:
+                    self._reply(404, "not found", "text/plain")
+            except FileNotFoundError as e:
+                self._reply(404, str(e), "text/plain")
+            except Exception as e:
+                # a reply instead of a dropped connection, so the client sees what went wrong
+                self._reply(500, f"{type(e).__name__}: {e}", "text/plain")
+
+        def log_message(self, format, *args):
+            pass
+
+    return ProviderRequestHandler
+
+def serve_provider(backend, host="127.0.0.1", port=8765, background=False):
+    server = ThreadingHTTPServer((host, port), make_handler(backend))
+    if background:
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+    else:
+        server.serve_forever()
+    return server
+
+def provider_from_config(config):
+    settings = config.get("data_provider", {})
+    kind = settings.get("type", "live")
+    path = settings.get("path", str(RECORDINGS_PATH))
+
+    if kind == "record":
+        return RecordingProvider(YFinanceProvider(), path)
+    if kind == "replay":
+        return ReplayProvider(path, settings.get("latency", 0.0), settings.get("jitter", 0.0))
+    if kind == "http":
+        return HttpProvider(settings.get("url", "http://127.0.0.1:8765"))
+    return YFinanceProvider()
+
+_provider = YFinanceProvider()
+
+def get_provider():
+    return _provider
+
+def set_provider(provider):
+    global _provider
+    _provider = provider
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve recorded market data over local HTTP.")
+    parser.add_argument("--path", default=str(RECORDINGS_PATH))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    args = parser.parse_args()
+
+    print(f"Serving {args.path} on http://{args.host}:{args.port}")
+    serve_provider(ReplayProvider(args.path, args.latency, args.jitter), args.host, args.port)
@@ -0,0 +1,97 @@
+import pandas as pd
+
+# finest bars fetched once per ticker; every view is sliced and resampled from one of these
+BASE_BARS = {
+    "intraday": ("5d", "1m"),
+    "daily": ("5y", "1d"),
+    # minute bars kept in a local store and backfilled in chunks by backfill.py
+    "history": ("1mo", "1m"),
+}
+
+PERIOD_BASE = {
+    "1d": "intraday", "5d": "intraday",
+    "1mo": "daily", "3mo": "daily", "6mo": "daily", "1y": "daily", "5y": "daily"
+}
+
+PERIOD_INTERVALS = {
+    "1d": ["1m", "5m", "15m", "30m", "1h"],
+    "5d": ["1d", "5m", "15m", "30m", "1h", "1m"],
+    "1mo": ["1d", "1wk", "5m", "15m", "30m", "1h", "1m"],
+    "3mo": ["1d", "1wk"],
+    "6mo": ["1d", "1wk", "1mo"],
+    "1y": ["1d", "1wk", "1mo"],
+    "5y": ["1d", "1wk", "1mo"],
+}
+
+INTRADAY_FREQ = {"1m": "1min", "5m": "5min", "15m": "15min", "30m": "30min", "1h": "60min"}
+
+OHLCV_AGG = {
+    "Open": "first", "High": "max", "Low": "min",
+    "Close": "last", "Adj Close": "last", "Volume": "sum"
+}
+
+# gaps longer than this end a trading day; lunch breaks and missing prints stay inside it
+DAY_GAP = pd.Timedelta(hours=4)
+ONE_DAY = pd.Timedelta(days=1)
+
+def default_interval(period):
+    return PERIOD_INTERVALS.get(period, ["1d"])[0]
+
+def view_base(period, interval):
+    base = PERIOD_BASE.get(period, "daily")
+    # intraday bars over a longer period come from the backfilled minute history
+    if base == "daily" and interval in INTRADAY_FREQ:
+        return "history"
+    # and daily bars over a short one from the daily series, as before there were intervals
+    if base == "intraday" and interval not in INTRADAY_FREQ:
+        return "daily"
+    return base
+
+def session_ids(index, gap=DAY_GAP):
+    breaks = index.to_series().diff() > gap
+    return breaks.cumsum().to_numpy()
+
+def slice_period(df, period):
+    if df.empty:
+        return df
+    if period in ("1d", "5d"):
+        days = 1 if period == "1d" else 5
+        sessions = session_ids(df.index)
+        if sessions[-1] > 0:
+            return df[sessions > sessions[-1] - days]
+        # round-the-clock markets have no overnight gap to split on
+        return df[df.index > df.index[-1] - pd.Timedelta(days=days)]
+    months = {"1mo": 1, "3mo": 3, "6mo": 6, "1y": 12, "5y": 60}.get(period)
+    if months is None:
+        return df
+    return df[df.index > df.index[-1] - pd.DateOffset(months=months)]
+
+def session_open(index):
+    # the regular open as a UTC time of day: the earliest first bar over all sessions, so a late
+    # first print cannot shift the grid; compared around the latest open to survive midnight wraps
+    firsts = index.to_series().groupby(session_ids(index)).min()
+    times = firsts - firsts.dt.floor("D")
+    latest = times.iloc[-1]
+    half_day = ONE_DAY / 2
+    return (latest + ((times - latest + half_day) % ONE_DAY - half_day).min()) % ONE_DAY
+
+def resample_ohlcv(df, interval, reference=None):
+    # reference: the full base series the open is detected from when df is only a slice of it
+    if df.empty or interval in ("1m", "1d"):
+        return df
+    agg = {col: how for col, how in OHLCV_AGG.items() if col in df.columns}
+
+    if interval in INTRADAY_FREQ:
+        # bins run on a grid from each day's regular open, so none straddles a session break
+        freq = pd.Timedelta(INTRADAY_FREQ[interval])
+        open_time = session_open((reference if reference is not None else df).index)
+        ts = df.index.to_series()
+        first = ts.groupby(session_ids(df.index)).transform("min")
+        day_open = first - (first - first.dt.floor("D") - open_time) % ONE_DAY
+        bins = day_open + ((ts - day_open) // freq) * freq
+        out = df.groupby(pd.DatetimeIndex(bins, name=df.index.name)).agg(agg)
+    else:
+        rule = {"1wk": "W-MON", "1mo": "MS"}[interval]
+        out = df.resample(rule, label="left", closed="left").agg(agg)
+
+    return out.dropna(subset=["Close"])
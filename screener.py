@@ -0,0 +1,136 @@
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import operator
+import numpy as np
+import pandas as pd
+import indicators
+
+DEFAULT_RULES = [
+    {"name": "Williams %R oversold", "left": "williams_r", "op": "<", "right": -80},
+    {"name": "StochRSI %K crossed above %D", "left": "stoch_k", "op": "crosses_above", "right": "stoch_d"},
+    {"name": "SMA20 crossed above SMA60", "left": "sma20", "op": "crosses_above", "right": "sma60"},
+]
+
+COMPARISONS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+# enough history for every built-in indicator window on daily bars
+LOOKBACK = 260
+
+def build_panel(frames, lookback=LOOKBACK):
+    # tail-aligned by bar position, so each ticker keeps its own calendar
+    tickers = [ticker for ticker, df in frames.items() if not df.empty]
+    panel = {}
+    for col in ["Open", "High", "Low", "Close", "Volume"]:
+        values = np.full((lookback, len(tickers)), np.nan)
+        for j, ticker in enumerate(tickers):
+            tail = frames[ticker][col].to_numpy(dtype=float)[-lookback:]
+            values[lookback - len(tail):, j] = tail
+        panel[col] = pd.DataFrame(values, columns=tickers)
+    return tickers, panel
+
+def compute_series(panel, name, cache):
+    if name in cache:
+        return cache[name]
+
+    if name == "close":
+        result = panel["Close"]
+    elif name == "vwap":
+        result = indicators.vwap(panel)
+    elif name == "williams_r":
+        result = indicators.williams_r(panel)
+    elif name == "mfi":
+        result = indicators.mfi(panel)
+    elif name in ("stoch_k", "stoch_d"):
+        cache["stoch_k"], cache["stoch_d"] = indicators.stoch_rsi(panel)
+        return cache[name]
+    elif name in ("fisher", "fisher_signal"):
+        cache["fisher"], cache["fisher_signal"] = indicators.fisher_transform(panel)
+        return cache[name]
+    elif name.startswith("sma"):
+        result = indicators.sma(panel, int(name[3:]))
+    elif name.startswith("kama"):
+        result = indicators.kama(panel, period=int(name[4:]))
+    else:
+        raise ValueError(f"Unknown screener series: {name}")
+
+    cache[name] = result
+    return result
+
+def last_rows(panel, operand, cache):
+    if isinstance(operand, (int, float)):
+        return np.full((2, panel["Close"].shape[1]), float(operand))
+    return compute_series(panel, operand, cache).to_numpy(dtype=float)[-2:]
+
+def evaluate_rules(panel, rules):
+    cache = {}
+    results = []
+    for rule in rules:
+        left = last_rows(panel, rule["left"], cache)
+        right = last_rows(panel, rule["right"], cache)
+        op = rule["op"]
+        with np.errstate(invalid="ignore"):
+            if op == "crosses_above":
+                hit = (left[0] <= right[0]) & (left[1] > right[1])
+            elif op == "crosses_below":
+                hit = (left[0] >= right[0]) & (left[1] < right[1])
+            else:
+                hit = COMPARISONS[op](left[1], right[1])
+        results.append(hit)
+    return np.array(results, dtype=bool).reshape(len(rules), -1)
+
+def evaluate_chunk(frames, rules):
+    tickers, panel = build_panel(frames)
+    return tickers, evaluate_rules(panel, rules)
+
+class Screener:
+    def __init__(self, rules=None, workers=None, parallel_threshold=1000, chunk_size=250):
+        self.rules = rules or DEFAULT_RULES
+        self.workers = workers
+        self.parallel_threshold = parallel_threshold
+        self.chunk_size = chunk_size
+        self.pool = None
+        self.matches = {}
+
+    def evaluate(self, frames):
+        if len(frames) < self.parallel_threshold:
+            tickers, hits = evaluate_chunk(frames, self.rules)
+            return dict(zip(tickers, hits.T))
+
+        # only very large lists repay the cost of shipping frames to worker processes
+        if self.pool is None:
+            # forking a process that runs Qt and QtWebEngine threads can copy a held lock into the child
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        items = list(frames.items())
+        chunks = [dict(items[i:i + self.chunk_size]) for i in range(0, len(items), self.chunk_size)]
+        futures = [self.pool.submit(evaluate_chunk, chunk, self.rules) for chunk in chunks]
+        results = {}
+        for future in futures:
+            tickers, hits = future.result()
+            results.update(zip(tickers, hits.T))
+        return results
+
+    def scan(self, frames):
+        # returns (ticker, rule name) pairs whose condition just turned true
+        # the first sighting of a ticker only sets its baseline
+        flipped = []
+        matches = self.evaluate(frames)
+        for ticker, hits in matches.items():
+            previous = self.matches.get(ticker)
+            if previous is None:
+                continue
+            for i, rule in enumerate(self.rules):
+                if hits[i] and not previous[i]:
+                    flipped.append((ticker, rule["name"]))
+        self.matches = matches
+        return flipped
+
+    def matching(self):
+        return {
+            rule["name"]: [ticker for ticker, hits in self.matches.items() if hits[i]]
+            for i, rule in enumerate(self.rules)
+        }
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
@@ -0,0 +1,293 @@
+import base64
+import json
+import random
+import threading
+import time
+import zlib
+import pandas as pd
+from resample import OHLCV_AGG
+
+YAHOO_STREAM_URL = "wss://streamer.finance.yahoo.com/?version=2"
+LOCAL_STREAM_URL = "ws://127.0.0.1:8766"
+# base bars are regular-session only, so pre/post-market prints are left out; pre-market is the
+# protobuf default (0), which Yahoo's messages omit, so a missing field is not a regular-hours print
+REGULAR_HOURS = (1, "REGULAR_MARKET")
+# Yahoo drops subscriptions that are not renewed
+SUBSCRIBE_INTERVAL = 15.0
+
+def parse_tick(message):
+    # Yahoo's decoded pricing messages and the local stand-in share these fields
+    ticker = message.get("id")
+    price = message.get("price")
+    if not ticker or price is None:
+        return None
+    if message.get("market_hours", message.get("marketHours")) not in REGULAR_HOURS:
+        return None
+    millis = int(message.get("time") or time.time() * 1000)
+    volume = message.get("day_volume", message.get("dayVolume"))
+    return ticker, pd.Timestamp(millis, unit="ms", tz="UTC"), float(price), None if volume is None else float(volume)
+
+class MinuteBarAggregator:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.day_volume = {}
+
+    def add(self, ticker, stamp, price, day_volume=None):
+        minute = stamp.floor("1min")
+        with self.lock:
+            previous = self.day_volume.get(ticker)
+            if day_volume is not None:
+                self.day_volume[ticker] = day_volume
+            # the feed carries cumulative day volume; a bar gets the increase since the last print
+            volume = day_volume - previous if previous is not None and day_volume is not None and day_volume >= previous else 0.0
+            bars = self.pending.setdefault(ticker, {})
+            bar = bars.get(minute)
+            if bar is None:
+                bars[minute] = {"Open": price, "High": price, "Low": price, "Close": price, "Volume": volume}
+            else:
+                bar["High"] = max(bar["High"], price)
+                bar["Low"] = min(bar["Low"], price)
+                bar["Close"] = price
+                bar["Volume"] += volume
+
+    def drain(self):
+        # {ticker: {minute: bar}} since the last drain, left as dicts so a drain costs next to nothing;
+        # bars_frame turns them into a frame once they are folded into a series
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        return pending
+
+def merge_drains(drains):
+    # drains in arrival order; a minute split across two of them becomes one bar again
+    merged = {}
+    for bars in drains:
+        for minute, bar in bars.items():
+            merged[minute] = extend_bar(merged[minute], bar) if minute in merged else bar
+    return merged
+
+def bars_frame(bars):
+    return pd.DataFrame.from_dict(bars, orient="index").sort_index()
+
+def extend_bar(bar, more):
+    bar = bar.copy()
+    bar["High"] = max(bar["High"], more["High"])
+    bar["Low"] = min(bar["Low"], more["Low"])
+    bar["Close"] = more["Close"]
+    bar["Volume"] = bar["Volume"] + more["Volume"]
+    return bar
+
+def fold_bars(bars, delta):
+    # late prints for bars that are already closed are dropped
+    delta = delta[delta.index >= bars.index[-1]]
+    if delta.empty:
+        return bars
+    delta = delta.reindex(columns=bars.columns).astype(bars.dtypes.to_dict())
+    if delta.index[0] == bars.index[-1]:
+        delta.iloc[0] = extend_bar(bars.iloc[-1], delta.iloc[0])
+        bars = bars.iloc[:-1]
+    return pd.concat([bars, delta])
+
+def daily_delta(delta, anchor):
+    # daily bars sit at UTC midnight of their trading date; whole days from the last one keep that alignment
+    days = (delta.index - anchor) // pd.Timedelta(days=1)
+    rows = delta.groupby(days).agg({col: OHLCV_AGG[col] for col in delta.columns})
+    rows.index = anchor + pd.to_timedelta(rows.index, unit="D")
+    return rows
+
+def encode_pricing(quote):
+    from yfinance.pricing_pb2 import PricingData
+
+    return json.dumps({"message": base64.b64encode(PricingData(**quote).SerializeToString()).decode("ascii")})
+
+def decode_pricing(message):
+    from google.protobuf.json_format import MessageToDict
+    from yfinance.pricing_pb2 import PricingData
+
+    pricing = PricingData()
+    pricing.ParseFromString(base64.b64decode(json.loads(message)["message"]))
+    return MessageToDict(pricing, preserving_proto_field_name=True)
+
+class WebSocketQuoteSource:
+    def __init__(self, url=LOCAL_STREAM_URL):
+        self.url = url
+        self.ws = None
+        self.closes = 0
+
+    def decode(self, message):
+        return json.loads(message)
+
+    def listen(self, symbols, handler):
+        from websockets.sync.client import connect
+
+        # errors from the connection or the handler end the call, so QuoteStream decides what happens next
+        subscribe = json.dumps({"subscribe": symbols})
+        closes = self.closes
+        with connect(self.url) as ws:
+            self.ws = ws
+            if self.closes != closes:
+                # close() came in during the handshake, before there was a connection to close
+                return
+            ws.send(subscribe)
+            while True:
+                try:
+                    message = ws.recv(timeout=SUBSCRIBE_INTERVAL)
+                except TimeoutError:
+                    ws.send(subscribe)
+                    continue
+                handler(self.decode(message))
+
+    def close(self):
+        self.closes += 1
+        ws = self.ws
+        if ws is not None:
+            ws.close()
+
+class YahooQuoteSource(WebSocketQuoteSource):
+    # yfinance's own WebSocket retries every error itself, so only its message format is used here
+    def __init__(self, url=YAHOO_STREAM_URL):
+        super().__init__(url)
+
+    def decode(self, message):
+        return decode_pricing(message)
+
+class StaleConnection(Exception):
+    pass
+
+class QuoteStream:
+    def __init__(self, source, on_tick=None, min_backoff=1.0, max_backoff=60.0):
+        self.source = source
+        self.on_tick = on_tick
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.aggregator = MinuteBarAggregator()
+        self.symbols = []
+        self.ticks = 0
+        self.stopping = threading.Event()
+        self.stopping.set()
+
+    def start(self, symbols):
+        self.symbols = list(symbols)
+        if not self.stopping.is_set():
+            # dropping the connection makes the loop resubscribe with the new list
+            self.source.close()
+            return
+        # each loop gets its own event, so one that is still winding down never resumes
+        self.stopping = threading.Event()
+        threading.Thread(target=self.run, args=(self.stopping,), daemon=True).start()
+
+    def stop(self):
+        self.stopping.set()
+        self.source.close()
+
+    def handle(self, message, stopping, symbols):
+        if stopping.is_set() or self.symbols != symbols:
+            raise StaleConnection()
+        tick = parse_tick(message)
+        if tick is None:
+            return
+        self.ticks += 1
+        self.aggregator.add(*tick)
+        if self.on_tick is not None:
+            self.on_tick(tick[0])
+
+    def run(self, stopping):
+        backoff = self.min_backoff
+        while not stopping.is_set():
+            symbols = self.symbols
+            ticks = self.ticks
+            try:
+                self.source.listen(symbols, lambda message: self.handle(message, stopping, symbols))
+            except StaleConnection:
+                pass
+            except Exception as e:
+                # closing the connection ourselves to stop or resubscribe is not worth a message
+                if not stopping.is_set() and self.symbols == symbols:
+                    print(f"Quote stream error: {e}")
+            if stopping.is_set():
+                break
+            if self.symbols != symbols:
+                continue
+            # a connection that delivered quotes was healthy, so start over from the short delay
+            if self.ticks > ticks:
+                backoff = self.min_backoff
+            delay = random.uniform(backoff / 2, backoff)
+            print(f"Quote stream disconnected, reconnecting in {delay:.1f}s")
+            stopping.wait(delay)
+            backoff = min(backoff * 2, self.max_backoff)
+
+def stream_from_config(config):
+    settings = config.get("quote_stream", {})
+    if settings.get("type", "yahoo") == "websocket":
+        return WebSocketQuoteSource(settings.get("url", LOCAL_STREAM_URL))
+    return YahooQuoteSource(settings.get("url", YAHOO_STREAM_URL))
+
+def start_prices(backend, symbols):
+    prices = {}
+    for symbol in symbols:
+        try:
+            prices[symbol] = float(backend.download(symbol, period="5d", interval="1m")["Close"].iloc[-1])
+        except Exception:
+            prices[symbol] = 100.0
+    return prices
+
+def make_quote_handler(backend=None, rate=2.0, drop_after=None, yahoo=False):
+    from websockets.exceptions import ConnectionClosed
+
+    encode = encode_pricing if yahoo else json.dumps
+
+    def handler(ws):
+        try:
+            symbols = json.loads(ws.recv()).get("subscribe", [])
+            prices = start_prices(backend, symbols) if backend is not None else dict.fromkeys(symbols, 100.0)
+            volumes = dict.fromkeys(symbols, 0)
+            rng = random.Random(zlib.crc32(",".join(symbols).encode()))
+            sent = 0
+            while symbols:
+                for symbol in symbols:
+                    prices[symbol] *= 1 + rng.gauss(0, 0.0005)
+                    volumes[symbol] += rng.randint(100, 5000)
+                    ws.send(encode({
+                        "id": symbol,
+                        "price": round(prices[symbol], 4),
+                        "time": int(time.time() * 1000),
+                        "day_volume": volumes[symbol],
+                        "market_hours": 1,
+                    }))
+                    sent += 1
+                    if drop_after and sent >= drop_after:
+                        ws.close()
+                        return
+                time.sleep(1.0 / rate)
+        except ConnectionClosed:
+            pass
+
+    return handler
+
+def serve_quotes(backend=None, host="127.0.0.1", port=8766, rate=2.0, drop_after=None, yahoo=False, background=False):
+    from websockets.sync.server import serve
+
+    server = serve(make_quote_handler(backend, rate, drop_after, yahoo), host, port)
+    if background:
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+    else:
+        server.serve_forever()
+    return server
+
+if __name__ == "__main__":
+    import argparse
+    from provider import ReplayProvider
+
+    parser = argparse.ArgumentParser(description="Stream synthetic quotes over a local websocket.")
+    parser.add_argument("--path", default=None, help="recordings folder to take starting prices from")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--rate", type=float, default=2.0, help="quotes per symbol per second")
+    parser.add_argument("--drop-after", type=int, default=None, help="close each connection after this many quotes")
+    parser.add_argument("--yahoo", action="store_true", help="send Yahoo's base64 protobuf messages instead of JSON")
+    args = parser.parse_args()
+
+    print(f"Streaming quotes on ws://{args.host}:{args.port}")
+    backend = ReplayProvider(args.path) if args.path else None
+    serve_quotes(backend, args.host, args.port, args.rate, args.drop_after, args.yahoo)
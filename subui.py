@@ -1,44 +1,180 @@
-
 from PyQt5.QtWidgets import (
-    QWidget, QLabel, QPushButton,
-    QVBoxLayout, QHBoxLayout, QListWidget, QListWidgetItem,
-    QDialog, QFrame
+    QVBoxLayout, QListView, QLineEdit, QDialog, QComboBox,
+    QStyledItemDelegate, QStyle, QApplication
+)
+from PyQt5.QtCore import (
+    QUrl, Qt, QSize, QRect, QAbstractListModel, QModelIndex,
+    QSortFilterProxyModel, pyqtSignal
 )
-from PyQt5.QtCore import QUrl
-from PyQt5.QtGui import QDesktopServices, QFont
-
-class NewsItemWidget(QWidget):
-    def __init__(self, published, title, link):
-        super().__init__()
-
-        time_label = QLabel(published)
-        title_label = QLabel(title)
-        title_label.setWordWrap(True)
-        title_label.setFont(QFont("", weight=QFont.Bold))
-
-        open_button = QPushButton("Open")
-        open_button.setMinimumWidth(60)
-        open_button.clicked.connect(lambda: QDesktopServices.openUrl(QUrl(link)))
-
-        button_layout = QHBoxLayout()
-        button_layout.addStretch()
-        button_layout.addWidget(open_button)
-
-        inner_layout = QVBoxLayout()
-        inner_layout.addWidget(time_label)
-        inner_layout.addWidget(title_label)
-        inner_layout.addLayout(button_layout)
-        inner_layout.setSpacing(6)
-        inner_layout.setContentsMargins(12, 12, 12, 12)
-
-        frame = QFrame()
-        frame.setLayout(inner_layout)
-        frame.setFrameShape(QFrame.StyledPanel)
-
-        outer_layout = QVBoxLayout()
-        outer_layout.addWidget(frame)
-        outer_layout.setContentsMargins(0, 0, 0, 0)
-        self.setLayout(outer_layout)
+from PyQt5.QtGui import QDesktopServices, QFont, QFontMetrics, QPixmap, QPixmapCache
+
+ThumbnailPathRole = Qt.UserRole + 1
+NewsLinkRole = Qt.UserRole + 2
+NewsPublishedRole = Qt.UserRole + 3
+QuoteRole = Qt.UserRole + 4
+
+class LazyComboBox(QComboBox):
+    def __init__(self, load_items, current_text="", parent=None):
+        super().__init__(parent)
+        self.load_items = load_items
+        self.loaded = False
+        self.addItem(current_text)
+
+    def ensure_loaded(self):
+        if self.loaded:
+            return
+        self.loaded = True
+        current = self.currentText()
+        self.blockSignals(True)
+        self.clear()
+        self.addItems(self.load_items())
+        self.setCurrentText(current)
+        self.blockSignals(False)
+
+    def showPopup(self):
+        self.ensure_loaded()
+        super().showPopup()
+
+class TickerListModel(QAbstractListModel):
+    # emitted the first time a row without an up-to-date thumbnail is looked at
+    thumbnail_needed = pyqtSignal(str)
+
+    def __init__(self, resolve_thumbnail, parent=None):
+        super().__init__(parent)
+        self.resolve_thumbnail = resolve_thumbnail
+        self.tickers = []
+        self.paths = {}
+        self.quotes = {}
+
+    def set_tickers(self, tickers):
+        self.beginResetModel()
+        self.tickers = list(tickers)
+        self.paths = {}
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.tickers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        ticker = self.tickers[index.row()]
+        if role == Qt.DisplayRole:
+            return ticker
+        if role == ThumbnailPathRole:
+            if ticker not in self.paths:
+                # resolved lazily, so only rows that get painted touch the disk
+                path, needs_render = self.resolve_thumbnail(ticker)
+                self.paths[ticker] = str(path) if path else ""
+                if needs_render:
+                    self.thumbnail_needed.emit(ticker)
+            return self.paths[ticker]
+        if role == QuoteRole:
+            return self.quotes.get(ticker, "")
+        return None
+
+    def thumbnail_updated(self, ticker, path):
+        QPixmapCache.remove(str(path))
+        self.paths[ticker] = str(path)
+        if ticker in self.tickers:
+            index = self.index(self.tickers.index(ticker))
+            self.dataChanged.emit(index, index, [ThumbnailPathRole])
+
+    def set_quote(self, ticker, text):
+        self.quotes[ticker] = text
+        if ticker in self.tickers:
+            index = self.index(self.tickers.index(ticker))
+            self.dataChanged.emit(index, index, [QuoteRole])
+
+class ThumbnailDelegate(QStyledItemDelegate):
+    def __init__(self, size=QSize(210, 160), image_size=QSize(200, 120), parent=None):
+        super().__init__(parent)
+        self.size = size
+        self.image_size = image_size
+
+    def sizeHint(self, option, index):
+        return self.size
+
+    def pixmap(self, path):
+        pixmap = QPixmapCache.find(path)
+        if pixmap is None or pixmap.isNull():
+            pixmap = QPixmap(path)
+            if not pixmap.isNull():
+                pixmap = pixmap.scaled(self.image_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+                QPixmapCache.insert(path, pixmap)
+        return pixmap
+
+    def paint(self, painter, option, index):
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawPrimitive(QStyle.PE_PanelItemViewItem, option, painter, option.widget)
+
+        rect = option.rect.adjusted(2, 2, -2, -2)
+        text_height = option.fontMetrics.height() + 4
+        quote = index.data(QuoteRole)
+        label = f"{index.data()}  {quote}" if quote else index.data()
+        painter.drawText(QRect(rect.x(), rect.y(), rect.width(), text_height), Qt.AlignCenter, label)
+
+        path = index.data(ThumbnailPathRole)
+        if path:
+            pixmap = self.pixmap(path)
+            if not pixmap.isNull():
+                x = rect.x() + (rect.width() - pixmap.width()) // 2
+                painter.drawPixmap(x, rect.y() + text_height, pixmap)
+
+class NewsListModel(QAbstractListModel):
+    def __init__(self, news_items, parent=None):
+        super().__init__(parent)
+        self.news_items = news_items
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.news_items)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        item = self.news_items[index.row()]
+        if role == Qt.DisplayRole:
+            return item["title"]
+        if role == NewsPublishedRole:
+            return item["published"].strftime("%Y-%m-%d %H:%M")
+        if role == NewsLinkRole:
+            return item["link"]
+        if role == Qt.ToolTipRole:
+            return item["link"]
+        return None
+
+class NewsItemDelegate(QStyledItemDelegate):
+    margin = 12
+
+    def title_font(self, option):
+        font = QFont(option.font)
+        font.setBold(True)
+        return font
+
+    def title_rect(self, option, index, width):
+        metrics = QFontMetrics(self.title_font(option))
+        return metrics.boundingRect(QRect(0, 0, width, 10000), Qt.TextWordWrap, index.data())
+
+    def sizeHint(self, option, index):
+        # the view asks with an empty option.rect; rows span its viewport, less the spacing around them
+        view = self.parent()
+        row_width = max(view.viewport().width() - 2 * view.spacing(), 4 * self.margin)
+        width = row_width - 2 * self.margin
+        height = option.fontMetrics.height() + 6 + self.title_rect(option, index, width).height()
+        return QSize(row_width, height + 2 * self.margin)
+
+    def paint(self, painter, option, index):
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawPrimitive(QStyle.PE_PanelItemViewItem, option, painter, option.widget)
+
+        rect = option.rect.adjusted(self.margin, self.margin, -self.margin, -self.margin)
+        time_height = option.fontMetrics.height()
+        painter.save()
+        painter.drawText(QRect(rect.x(), rect.y(), rect.width(), time_height), Qt.AlignLeft, index.data(NewsPublishedRole))
+        painter.setFont(self.title_font(option))
+        title_rect = QRect(rect.x(), rect.y() + time_height + 6, rect.width(), rect.height() - time_height - 6)
+        painter.drawText(title_rect, Qt.TextWordWrap, index.data())
+        painter.restore()
 
 class NewsDialog(QDialog):
     def __init__(self, news_items, parent=None, ticker=""):
@@ -46,21 +182,25 @@ class NewsDialog(QDialog):
         self.setWindowTitle(f"News: {ticker}")
         self.setMinimumSize(750, 600)
 
-        self.list_widget = QListWidget()
-        self.list_widget.setSpacing(8)
-
-        for item in news_items:
-            published = item["published"].strftime("%Y-%m-%d %H:%M")
-            title = item["title"]
-            link = item["link"]
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Filter headlines...")
 
-            widget = NewsItemWidget(published, title, link)
-            list_item = QListWidgetItem()
-            list_item.setSizeHint(widget.sizeHint())
+        self.model = NewsListModel(news_items, self)
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.filter_input.textChanged.connect(self.proxy.setFilterFixedString)
 
-            self.list_widget.addItem(list_item)
-            self.list_widget.setItemWidget(list_item, widget)
+        self.list_view = QListView()
+        self.list_view.setModel(self.proxy)
+        self.list_view.setItemDelegate(NewsItemDelegate(self.list_view))
+        self.list_view.setSpacing(4)
+        self.list_view.setWordWrap(True)
+        self.list_view.setResizeMode(QListView.Adjust)
+        # double-click or Enter opens the article
+        self.list_view.activated.connect(lambda index: QDesktopServices.openUrl(QUrl(index.data(NewsLinkRole))))
 
         layout = QVBoxLayout()
-        layout.addWidget(self.list_widget)
+        layout.addWidget(self.filter_input)
+        layout.addWidget(self.list_view)
         self.setLayout(layout)
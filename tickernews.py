@@ -13,17 +13,17 @@ import math
 import time
 import io
 import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.firefox.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-import yfinance as yf
-import feedparser
 from urllib.parse import quote
 from datetime import datetime, timedelta
+from provider import get_provider
 
 def get_etf_description(etf_symbol, headless=True, wait_time=15, min_weight=0.01):
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.firefox.options import Options
+    from selenium.webdriver.support.ui import WebDriverWait
+
     options = Options()
     options.headless = headless
     driver = webdriver.Firefox(options=options)
@@ -122,9 +122,8 @@ def get_etf_description(etf_symbol, headless=True, wait_time=15, min_weight=0.01
         driver.quit()
 
 def build_search_queries(ticker_symbol, headless=True, min_weight=0.01):
-    ticker = yf.Ticker(ticker_symbol)
     try:
-        info = ticker.info
+        info = get_provider().info(ticker_symbol)
     except Exception:
         info = {}
     queries = set()
@@ -145,6 +144,8 @@ def build_search_queries(ticker_symbol, headless=True, min_weight=0.01):
     return list(queries)
 
 def fetch_news_for_queries(queries, days=5):
+    import feedparser
+
     news_items = []
     cutoff = datetime.now() - timedelta(days=days)
     for query in queries:
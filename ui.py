@@ -2,42 +2,49 @@ import pytz
 import time
 from PyQt5.QtWidgets import (
     QWidget, QLabel, QRadioButton, QCheckBox, QPushButton,
-    QVBoxLayout, QHBoxLayout, QButtonGroup, QListWidget, QListWidgetItem,
-    QSplitter, QLineEdit, QComboBox, QMessageBox, QSizePolicy
+    QVBoxLayout, QHBoxLayout, QButtonGroup, QListView,
+    QSplitter, QLineEdit, QComboBox, QMessageBox, QSizePolicy,
+    QSystemTrayIcon, QStyle
 )
-from PyQt5.QtCore import QTimer, Qt, QSize
-from PyQt5.QtGui import QPixmap
+from PyQt5.QtCore import QTimer, Qt, QModelIndex, QSortFilterProxyModel, QUrl, pyqtSignal
 from PyQt5.QtWebEngineWidgets import QWebEngineView
 from qt_material import list_themes
 
-from data import fetch_market_data, create_plot_html, create_thumbnail, calculate_price_changes, CONFIG_PATH, load_config, save_config
-from tickernews import build_search_queries, fetch_news_for_queries
-from subui import NewsDialog
-
-def create_thumbnail_widget(ticker, timezone, force_update=False):
-    thumb_path = create_thumbnail(ticker, timezone, force_update)
-
-    widget = QWidget()
-    layout = QVBoxLayout()
-    layout.setContentsMargins(2, 2, 2, 2)
-
-    label = QLabel(ticker)
-    label.setAlignment(Qt.AlignCenter)
-
-    pixmap = QPixmap(thumb_path)
-    image_label = QLabel()
-    image_label.setPixmap(pixmap)
-    image_label.setAlignment(Qt.AlignCenter)
-
-    layout.addWidget(label)
-    layout.addWidget(image_label)
-    widget.setLayout(layout)
-
-    return widget
+from data import (
+    fetch_market_data, create_plot_html, create_plot_figure, create_thumbnail_async, calculate_price_changes, queue_live_bars, live_change,
+    thumbnail_path, find_thumbnail, has_cached_bars, cached_frames, chart_cache_path,
+    prefetch_market_data, load_in_background, load_chart_async, backfill_watchlist, pending_history, hot_cache_stats, PLOTS_PATH, CONFIG_PATH, load_config, save_config_async
+)
+from analytics import create_comparison_html
+from resample import PERIOD_INTERVALS, default_interval, view_base
+from screener import Screener
+from streaming import QuoteStream, stream_from_config
+from subui import LazyComboBox, NewsDialog, TickerListModel, ThumbnailDelegate
+
+# a ticker revisited within this many seconds is drawn from memory
+SELECTION_MAX_AGE = 60
+# daily bars older than this are downloaded again before a screener pass
+SCREENER_MAX_AGE = 15 * 60
+SET_HTML_LIMIT = 1_500_000
+
+def emit_when_done(future, signal, *args):
+    # done-callbacks run on the worker thread, and emitting a signal from there queues the slot
+    # on the GUI thread; a callable argument is called with the finished future on the worker
+    future.add_done_callback(lambda f: signal.emit(*(arg(f) if callable(arg) else arg for arg in args)))
 
 class StockApp(QWidget):
-    def __init__(self):
+    # emitted from the stream thread; Qt queues it over to the GUI thread
+    quote_received = pyqtSignal(str)
+    backfill_finished = pyqtSignal(str)
+    history_stored = pyqtSignal(str)
+    thumbnail_ready = pyqtSignal(str, str)
+    comparison_loaded = pyqtSignal(str)
+    screener_loaded = pyqtSignal()
+    chart_loaded = pyqtSignal(str)
+
+    def __init__(self, startup_t0=None):
         super().__init__()
+        self.startup_t0 = startup_t0 if startup_t0 is not None else time.perf_counter()
         self.setWindowTitle("TikrScope")
         self.setGeometry(100, 100, 1200, 750)
 
@@ -46,9 +53,7 @@ class StockApp(QWidget):
         self.ticker_input = QLineEdit()
         self.ticker_input.setText(','.join(self.config["tickers"]))
 
-        self.timezone_selector = QComboBox()
-        self.timezone_selector.addItems(pytz.all_timezones)
-        self.timezone_selector.setCurrentText(self.config["timezone"])
+        self.timezone_selector = LazyComboBox(lambda: pytz.all_timezones, self.config["timezone"])
         self.timezone_selector.currentTextChanged.connect(self.change_timezone)
 
         self.theme_selector = QComboBox()
@@ -68,21 +73,50 @@ class StockApp(QWidget):
         ticker_input_layout.addWidget(self.theme_selector)
         ticker_input_layout.addWidget(self.ticker_update_btn)
 
-        self.ticker_list = QListWidget()
-        self.ticker_list.setIconSize(QSize(200, 140))
-        self.ticker_list.currentItemChanged.connect(self.update_plot)
+        self.ticker_model = TickerListModel(self.resolve_thumbnail, self)
+        self.ticker_model.thumbnail_needed.connect(self.enqueue_thumbnail)
+        self.ticker_proxy = QSortFilterProxyModel(self)
+        self.ticker_proxy.setSourceModel(self.ticker_model)
+        self.ticker_proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
+
+        # only visible rows are painted, so thumbnails load as they scroll into view
+        self.ticker_list = QListView()
+        self.ticker_list.setModel(self.ticker_proxy)
+        self.ticker_list.setItemDelegate(ThumbnailDelegate(parent=self.ticker_list))
+        self.ticker_list.setUniformItemSizes(True)
+
+        self.ticker_filter = QLineEdit()
+        self.ticker_filter.setPlaceholderText("Filter tickers...")
+        self.ticker_filter.textChanged.connect(self.filter_tickers)
 
         self.thumb_update_btn = QPushButton("Update Thumbnails")
         self.thumb_update_btn.clicked.connect(self.update_all_thumbnails)
 
+        self.cache_status = QLabel()
+        self.cache_status.setStyleSheet("color: gray;")
+
+        self.backfill_status = QLabel()
+        self.backfill_status.setStyleSheet("color: gray;")
+        self.backfill_status.setWordWrap(True)
+
+        self.screener_summary = QLabel()
+        self.screener_summary.setWordWrap(True)
+
         left_layout = QVBoxLayout()
         left_layout.addWidget(self.thumb_update_btn)
+        left_layout.addWidget(self.ticker_filter)
         left_layout.addWidget(self.ticker_list)
+        left_layout.addWidget(self.screener_summary)
+        left_layout.addWidget(self.backfill_status)
+        left_layout.addWidget(self.cache_status)
 
         left_widget = QWidget()
         left_widget.setLayout(left_layout)
 
         self.web_view = QWebEngineView()
+        self.web_view.loadFinished.connect(self.report_first_plot)
+        self.waiting_first_plot = False
+        self.chart_loaded.connect(self.finish_chart_load)
 
         self.chart_type_group = QButtonGroup()
         chart_layout = QHBoxLayout()
@@ -106,6 +140,12 @@ class StockApp(QWidget):
             self.period_group.addButton(rb)
             period_layout.addWidget(rb)
 
+        self.interval_selector = QComboBox()
+        self.update_interval_choices()
+        self.interval_selector.currentTextChanged.connect(self.change_interval)
+        period_layout.addWidget(QLabel("Interval:"))
+        period_layout.addWidget(self.interval_selector)
+
         indicator_layout = QHBoxLayout()
         self.main_indicator_group = {}
         indicator_layout.setAlignment(Qt.AlignLeft)
@@ -134,11 +174,21 @@ class StockApp(QWidget):
             if self.config.get("sub_indicator", "williams_r") == key:
                 rb.setChecked(True)
 
-        self.auto_refresh_checkbox = QCheckBox("Auto Refresh (30 sec)")
-        self.auto_refresh_checkbox.stateChanged.connect(self.toggle_auto_refresh)
+        self.compare_checkbox = QCheckBox("Compare Watchlist")
+        self.compare_checkbox.stateChanged.connect(lambda _: self.request_render())
+
+        self.live_quotes_checkbox = QCheckBox("Live Quotes")
+        self.live_quotes_checkbox.stateChanged.connect(self.toggle_live_quotes)
 
         self.manual_update_btn = QPushButton("Update Plot Now")
         self.manual_update_btn.clicked.connect(self.update_plot)
+        self.manual_update_btn.clicked.connect(self.run_screener)
+
+        self.backfill_btn = QPushButton("Backfill Intraday")
+        self.backfill_btn.clicked.connect(self.backfill_intraday)
+        self.backfill_finished.connect(self.finish_backfill)
+        self.history_stored.connect(self.finish_history)
+        self.watched_history = set()
 
         self.search_news_btn = QPushButton("Search News")
         self.search_news_btn.clicked.connect(self.search_news)
@@ -154,9 +204,11 @@ class StockApp(QWidget):
         options_layout.addLayout(indicator_layout)
         options_layout.addLayout(sub_indicator_layout)
         refresh_layout = QHBoxLayout()
-        refresh_layout.addWidget(self.auto_refresh_checkbox)
+        refresh_layout.addWidget(self.live_quotes_checkbox)
         refresh_layout.addWidget(self.manual_update_btn)
+        refresh_layout.addWidget(self.backfill_btn)
         refresh_layout.addWidget(self.search_news_btn)
+        refresh_layout.addWidget(self.compare_checkbox)
         options_layout.addLayout(refresh_layout)
 
         chart_layout = QVBoxLayout()
@@ -181,51 +233,246 @@ class StockApp(QWidget):
 
         self.setLayout(main_layout)
 
+        # the watchlist is screened on its own beat, live quotes or not
         self.timer = QTimer()
         self.timer.setInterval(30000)
-        self.timer.timeout.connect(self.update_plot)
-
+        self.timer.timeout.connect(self.run_screener)
+        self.screener_loading = 0
+        self.screener_loaded.connect(self.finish_screener_load)
+
+        self.quote_stream = QuoteStream(stream_from_config(self.config), on_tick=self.quote_received.emit)
+        self.quote_received.connect(self.queue_live_update)
+        self.live_chart = None
+        self.live_timer = QTimer()
+        self.live_timer.setSingleShot(True)
+        self.live_timer.setInterval(250)
+        self.live_timer.timeout.connect(self.apply_live_quotes)
+
+        self.screener = Screener(self.config.get("alerts"))
+        self.tray_icon = QSystemTrayIcon(self.style().standardIcon(QStyle.SP_ComputerIcon), self)
+        self.tray_icon.setToolTip("TikrScope")
+        self.tray_icon.show()
+
+        self.render_timer = QTimer()
+        self.render_timer.setSingleShot(True)
+        self.render_timer.setInterval(150)
+        self.render_timer.timeout.connect(self.render_requested_plot)
+        self.render_refresh = False
+
+        self.config_save_timer = QTimer()
+        self.config_save_timer.setSingleShot(True)
+        self.config_save_timer.setInterval(500)
+        self.config_save_timer.timeout.connect(self.flush_config)
+
+        self.comparison_pending = set()
+        self.comparison_unavailable = set()
+        self.comparison_timer = QTimer()
+        self.comparison_timer.setSingleShot(True)
+        self.comparison_timer.setInterval(1500)
+        self.comparison_timer.timeout.connect(self.refresh_comparison)
+        self.comparison_loaded.connect(self.finish_comparison_load)
+
+        self.thumbnail_queue = []
+        self.thumbnail_timer = QTimer()
+        self.thumbnail_timer.setSingleShot(True)
+        self.thumbnail_timer.setInterval(500)
+        self.thumbnail_timer.timeout.connect(self.process_thumbnail_queue)
+        self.thumbnail_ready.connect(self.finish_thumbnail)
+
+        self.selected_ticker = None
         self.populate_thumbnails()
         if self.config["tickers"]:
-            self.ticker_list.setCurrentRow(0)
+            self.set_current_row(0)
+            self.selected_ticker = self.ticker_at(0)
+            self.show_cached_plot(self.get_selected_ticker())
+        self.ticker_list.selectionModel().currentChanged.connect(self.select_ticker)
+
+    def finish_startup(self):
+        print(f"Startup: window shown in {(time.perf_counter() - self.startup_t0) * 1000:.0f} ms")
+        if self.config["tickers"]:
+            # last session's chart is already up; fresh bars replace it once they are in
+            self.waiting_first_plot = True
+            ticker = self.get_selected_ticker()
+            future = load_chart_async(ticker, self.config["period"], self.current_interval(), self.indicator_names())
+            emit_when_done(future, self.chart_loaded, ticker)
+        self.run_screener()
+        self.timer.start()
+
+    def finish_chart_load(self, ticker):
+        if ticker == self.get_selected_ticker() and not self.compare_checkbox.isChecked():
+            self.render_plot(refresh=False)
+
+    def report_first_plot(self, ok):
+        # setHtml returns before the page is drawn, so the plot only counts once it has loaded
+        if ok and self.waiting_first_plot:
+            self.waiting_first_plot = False
+            print(f"Startup: first plot ready in {(time.perf_counter() - self.startup_t0) * 1000:.0f} ms")
+
+    def request_render(self, refresh=False):
+        self.render_refresh = self.render_refresh or refresh
+        self.render_timer.start()
+
+    def render_requested_plot(self):
+        self.render_plot(self.render_refresh)
+
+    def request_config_save(self):
+        self.config_save_timer.start()
+
+    def flush_config(self):
+        self.config_save_timer.stop()
+        save_config_async(CONFIG_PATH, self.config)
+
+    def closeEvent(self, event):
+        if self.config_save_timer.isActive():
+            self.config_save_timer.stop()
+            # through the writer queue, so it cannot race a background write on the same temp file
+            save_config_async(CONFIG_PATH, self.config).result()
+        self.screener.shutdown()
+        self.quote_stream.stop()
+        prefetch_market_data([])
+        super().closeEvent(event)
+
+    def show_cached_plot(self, ticker):
+        cache_path = chart_cache_path(ticker)
+        if cache_path.exists():
+            self.show_html(cache_path.read_text(encoding="utf-8"))
+
+    def show_html(self, html):
+        # setHtml silently drops pages over 2 MB, so big charts are loaded from disk instead
+        if len(html) < SET_HTML_LIMIT:
+            self.web_view.setHtml(html)
+            return
+        view_path = PLOTS_PATH / "_view.html"
+        view_path.parent.mkdir(exist_ok=True)
+        view_path.write_text(html, encoding="utf-8")
+        self.web_view.load(QUrl.fromLocalFile(str(view_path.resolve())))
 
     def apply_tickers(self):
         tickers_str = self.ticker_input.text().strip()
         if tickers_str:
             self.config["tickers"] = [t.strip().upper() for t in tickers_str.split(',') if t.strip()]
-            save_config(CONFIG_PATH, self.config)
+            self.request_config_save()
             self.populate_thumbnails(force_update=True)
+            if self.live_quotes_checkbox.isChecked():
+                self.quote_stream.start(self.config["tickers"])
             if self.config["tickers"]:
-                self.ticker_list.setCurrentRow(0)
+                self.request_render(refresh=True)
+                self.set_current_row(0)
+
+    def current_row(self):
+        return self.ticker_list.currentIndex().row()
+
+    def set_current_row(self, row):
+        self.ticker_list.setCurrentIndex(self.ticker_proxy.index(row, 0))
+
+    def ticker_at(self, row):
+        return self.ticker_proxy.index(row, 0).data()
+
+    def source_index(self, ticker):
+        tickers = self.config["tickers"]
+        if ticker not in tickers:
+            return QModelIndex()
+        return self.ticker_proxy.mapFromSource(self.ticker_model.index(tickers.index(ticker), 0))
 
     def populate_thumbnails(self, force_update=False):
-        self.ticker_list.clear()
-        for ticker in self.config["tickers"]:
-            item_widget = create_thumbnail_widget(ticker, self.config["timezone"], force_update)
-            item = QListWidgetItem()
-            item.setSizeHint(QSize(210, 160))
-            self.ticker_list.addItem(item)
-            self.ticker_list.setItemWidget(item, item_widget)
-            time.sleep(0.5)
+        # keep the selection across a rebuild without firing a render per reset/select
+        current_row = self.current_row()
+        selection = self.ticker_list.selectionModel()
+        selection.blockSignals(True)
+        self.thumbnail_queue = []
+        self.ticker_model.set_tickers(self.config["tickers"])
+        if force_update:
+            for ticker in self.config["tickers"]:
+                self.enqueue_thumbnail(ticker, force_update=True)
+        index = self.source_index(self.selected_ticker)
+        if index.isValid():
+            self.ticker_list.setCurrentIndex(index)
+        elif current_row >= 0 and self.ticker_proxy.rowCount():
+            self.set_current_row(min(current_row, self.ticker_proxy.rowCount() - 1))
+            self.selected_ticker = self.ticker_at(self.current_row())
+        selection.blockSignals(False)
+
+    def filter_tickers(self, text):
+        # the chart stays on the selected ticker while the filter hides its row, and the row is
+        # selected again once it matches; nothing else gets selected (and rendered) in between
+        selection = self.ticker_list.selectionModel()
+        selection.blockSignals(True)
+        self.ticker_proxy.setFilterFixedString(text)
+        self.ticker_list.setCurrentIndex(self.source_index(self.selected_ticker))
+        selection.blockSignals(False)
+        self.ticker_list.viewport().update()
+
+    def resolve_thumbnail(self, ticker):
+        timezone = self.config["timezone"]
+        thumb_path = find_thumbnail(ticker, timezone)
+        # a missing zone variant is only rendered when it costs no download
+        stale_zone = thumb_path != thumbnail_path(ticker, timezone) and has_cached_bars(ticker, "5y")
+        return thumb_path, thumb_path is None or stale_zone
+
+    def enqueue_thumbnail(self, ticker, force_update=False):
+        if all(queued != ticker for queued, _ in self.thumbnail_queue):
+            self.thumbnail_queue.append((ticker, force_update))
+        if not self.thumbnail_timer.isActive():
+            self.thumbnail_timer.start()
+
+    def process_thumbnail_queue(self):
+        if not self.thumbnail_queue:
+            return
+        ticker, force_update = self.thumbnail_queue.pop(0)
+        future = create_thumbnail_async(ticker, self.config["timezone"], force_update)
+        emit_when_done(future, self.thumbnail_ready, ticker, lambda f: self.thumbnail_result(ticker, f))
+
+    def thumbnail_result(self, ticker, future):
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"Failed to create thumbnail for {ticker}: {e}")
+            return ""
+
+    def finish_thumbnail(self, ticker, thumb_path):
+        try:
+            if thumb_path:
+                self.ticker_model.thumbnail_updated(ticker, thumb_path)
+        finally:
+            # spaced out to stay polite with the data provider, and never left stopped
+            self.thumbnail_timer.start()
 
     def update_all_thumbnails(self):
         self.populate_thumbnails(force_update=True)
 
     def change_chart_type(self):
         self.config["chart_type"] = self.chart_type_group.checkedButton().text().lower()
-        save_config(CONFIG_PATH, self.config)
-        self.update_plot()
+        self.request_config_save()
+        self.request_render()
+
+    def current_interval(self):
+        period = self.config["period"]
+        interval = self.config.get("intervals", {}).get(period)
+        return interval if interval in PERIOD_INTERVALS.get(period, []) else default_interval(period)
+
+    def update_interval_choices(self):
+        self.interval_selector.blockSignals(True)
+        self.interval_selector.clear()
+        self.interval_selector.addItems(PERIOD_INTERVALS.get(self.config["period"], ["1d"]))
+        self.interval_selector.setCurrentText(self.current_interval())
+        self.interval_selector.blockSignals(False)
+
+    def change_interval(self, interval):
+        self.config.setdefault("intervals", {})[self.config["period"]] = interval
+        self.request_config_save()
+        self.request_render()
 
     def change_period(self):
         self.config["period"] = self.period_group.checkedButton().text()
-        save_config(CONFIG_PATH, self.config)
-        self.update_plot()
+        self.update_interval_choices()
+        self.request_config_save()
+        self.request_render()
 
     def change_main_indicator(self):
         selected_indicators = [indicator for indicator, cb in self.main_indicator_group.items() if cb.isChecked()]
         self.config["main_indicator"] = selected_indicators
-        save_config(CONFIG_PATH, self.config)
-        self.update_plot()
+        self.request_config_save()
+        self.request_render()
 
     def change_sub_indicator(self):
         checked_button = self.sub_indicator_group.checkedButton()
@@ -233,26 +480,27 @@ class StockApp(QWidget):
             for key, label in self.sub_indicators.items():
                 if checked_button.text() == label:
                     self.config["sub_indicator"] = key
-                    save_config(CONFIG_PATH, self.config)
-                    self.update_plot()
+                    self.request_config_save()
+                    self.request_render()
                     break
 
     def change_timezone(self, tz):
         self.config["timezone"] = tz
-        save_config(CONFIG_PATH, self.config)
+        self.request_config_save()
         self.populate_thumbnails(force_update=False)
-        self.update_plot()
+        self.request_render()
 
     def change_theme(self, theme):
         self.config["theme"] = theme
-        save_config(CONFIG_PATH, self.config)
+        self.request_config_save()
         QMessageBox.information(self, "Theme Changed", "Theme has been changed.\nPlease restart the application to apply it.")
 
     def get_selected_ticker(self):
-        current_item = self.ticker_list.currentItem()
-        if current_item:
-            widget = self.ticker_list.itemWidget(current_item)
-            return widget.layout().itemAt(0).widget().text()
+        index = self.ticker_list.currentIndex()
+        if index.isValid():
+            return index.data()
+        if self.selected_ticker in self.config["tickers"]:
+            return self.selected_ticker
         return self.config["tickers"][0]
 
     def format_change_summary(self, changes):
@@ -268,8 +516,49 @@ class StockApp(QWidget):
         return "   ".join(parts)
 
     def update_plot(self):
+        self.render_plot(refresh=True)
+
+    def select_ticker(self, current=None, previous=None):
+        # filtering the current row away leaves nothing selected; keep the chart as is
+        if current is not None and not current.isValid():
+            return
+        self.selected_ticker = self.get_selected_ticker()
+        self.render_plot(refresh=False, max_age=SELECTION_MAX_AGE)
+
+    def indicator_names(self):
+        return self.config["main_indicator"] + [self.config["sub_indicator"]]
+
+    def prefetch_likely_views(self):
+        # neighbours in the list for the current view, then this ticker on the other base series
+        period, interval = self.config["period"], self.current_interval()
+        row = self.current_row()
+        requests = []
+        for offset in (1, -1, 2, -2):
+            if 0 <= row + offset < self.ticker_proxy.rowCount():
+                requests.append((self.ticker_at(row + offset), period, interval))
+        other_period = "1y" if view_base(period, interval) == "intraday" else "1d"
+        requests.append((self.get_selected_ticker(), other_period, default_interval(other_period)))
+        prefetch_market_data(requests, self.indicator_names())
+
+    def update_cache_status(self):
+        stats = hot_cache_stats()
+        self.cache_status.setText(
+            f"Cache: {stats['entries']} frames, {stats['bytes'] / 1024 / 1024:.1f} MB, "
+            f"hit rate {stats['hit_rate'] * 100:.0f}%"
+        )
+
+    def render_plot(self, refresh, max_age=None):
+        # a direct render supersedes any debounced one still waiting
+        self.render_timer.stop()
+        self.render_refresh = False
+        if self.compare_checkbox.isChecked():
+            self.render_comparison()
+            return
         ticker = self.get_selected_ticker()
-        df = fetch_market_data(ticker, self.config["period"], self.config["timezone"])
+        df = fetch_market_data(
+            ticker, self.config["period"], refresh=refresh, interval=self.current_interval(),
+            max_age=max_age, indicator_names=self.indicator_names()
+        )
 
         changes = calculate_price_changes(df)
         self.change_summary.setTextFormat(Qt.RichText)
@@ -280,11 +569,135 @@ class StockApp(QWidget):
             self.config["chart_type"],
             self.config["theme"],
             self.config["main_indicator"],
-            self.config["sub_indicator"]
+            self.config["sub_indicator"],
+            self.config["timezone"],
+            self.current_interval()
         )
-        self.web_view.setHtml(html)
+        self.show_html(html)
+        self.live_chart = None if df.empty else ticker
+        if not df.empty:
+            chart_cache_path(ticker).parent.mkdir(exist_ok=True)
+            chart_cache_path(ticker).write_text(html, encoding="utf-8")
+        self.watch_history(ticker)
+        self.prefetch_likely_views()
+        self.update_cache_status()
+
+    def render_comparison(self):
+        # cached tickers are drawn now; the rest load in the background and join as they arrive
+        period, interval = self.config["period"], self.current_interval()
+        frames, missing = {}, []
+        for ticker in self.config["tickers"]:
+            if has_cached_bars(ticker, period, interval):
+                frames[ticker] = fetch_market_data(ticker, period, refresh=False, interval=interval)
+            elif (ticker, period, interval) not in self.comparison_unavailable:
+                missing.append(ticker)
+        self.load_comparison(missing, period, interval)
+
+        self.live_chart = None
+        self.change_summary.setTextFormat(Qt.PlainText)
+        summary = f"Comparing {sum(not df.empty for df in frames.values())} tickers"
+        if missing:
+            summary += f", loading {len(missing)} more"
+        self.change_summary.setText(summary)
+        self.show_html(create_comparison_html(frames, self.config["theme"], self.config["timezone"], interval))
+
+    def load_comparison(self, tickers, period, interval):
+        tickers = [ticker for ticker in tickers if ticker not in self.comparison_pending]
+        futures = load_in_background([(ticker, period, interval) for ticker in tickers])
+        for ticker, future in zip(tickers, futures):
+            self.comparison_pending.add(ticker)
+            emit_when_done(future, self.comparison_loaded, ticker)
+
+    def finish_comparison_load(self, ticker):
+        self.comparison_pending.discard(ticker)
+        period, interval = self.config["period"], self.current_interval()
+        if not has_cached_bars(ticker, period, interval):
+            # a failed download is not retried on every redraw
+            self.comparison_unavailable.add((ticker, period, interval))
+        # arrivals are batched into one redraw at most every comparison_timer interval
+        if self.compare_checkbox.isChecked() and not self.comparison_timer.isActive():
+            self.comparison_timer.start()
+
+    def refresh_comparison(self):
+        if self.compare_checkbox.isChecked():
+            self.render_comparison()
+
+    def run_screener(self):
+        # daily bars for the whole watchlist are loaded or refreshed off the GUI thread first
+        if self.screener_loading:
+            return
+        tickers = list(self.config["tickers"])
+        if not tickers:
+            return
+        self.screener_loading = len(tickers)
+        futures = load_in_background([(ticker, "1y", "1d") for ticker in tickers], max_age=SCREENER_MAX_AGE)
+        for future in futures:
+            emit_when_done(future, self.screener_loaded)
+
+    def finish_screener_load(self):
+        self.screener_loading -= 1
+        if self.screener_loading == 0:
+            self.scan_watchlist()
+
+    def scan_watchlist(self):
+        frames = cached_frames(self.config["tickers"])
+        if not frames:
+            return
+        try:
+            flipped = self.screener.scan(frames)
+        except (KeyError, ValueError) as e:
+            print(f"Screener failed: {e}")
+            return
+
+        if flipped:
+            lines = [f"{ticker}: {name}" for ticker, name in flipped]
+            self.tray_icon.showMessage("TikrScope Alert", "\n".join(lines[:10]), QSystemTrayIcon.Information)
+
+        parts = [f"{name}: {', '.join(tickers)}" for name, tickers in self.screener.matching().items() if tickers]
+        self.screener_summary.setText("\n".join(parts))
+
+    def backfill_intraday(self):
+        tickers = list(self.config["tickers"])
+        self.backfill_btn.setEnabled(False)
+        self.backfill_status.setText(f"Backfilling 1m history for {len(tickers)} tickers...")
+        future = backfill_watchlist(tickers)
+        emit_when_done(future, self.backfill_finished, self.format_backfill)
+
+    def format_backfill(self, future):
+        try:
+            results = future.result()
+        except Exception as e:
+            return f"Backfill failed: {e}"
+        bars = sum(count for count, _ in results.values())
+        gaps = {ticker: len(spans) for ticker, (_, spans) in results.items() if spans}
+        text = f"1m history: {bars:,} bars for {len(results)} tickers"
+        if gaps:
+            text += "; gaps left in " + ", ".join(f"{ticker} ({count})" for ticker, count in gaps.items())
+        return text
+
+    def finish_backfill(self, text):
+        self.backfill_btn.setEnabled(True)
+        self.backfill_status.setText(text)
+        if view_base(self.config["period"], self.current_interval()) == "history":
+            self.request_render()
+
+    def watch_history(self, ticker):
+        # a minute-history view is drawn from what is on hand while its backfill runs in the background
+        future = pending_history(ticker)
+        if future is not None and future not in self.watched_history:
+            self.watched_history.add(future)
+            emit_when_done(future, self.history_stored, ticker)
+
+    def finish_history(self, ticker):
+        self.watched_history = {future for future in self.watched_history if not future.done()}
+        period, interval = self.config["period"], self.current_interval()
+        # nothing stored (a failed backfill) is not redrawn, so it is not queued again right away
+        if ticker == self.get_selected_ticker() and view_base(period, interval) == "history" and has_cached_bars(ticker, period, interval):
+            self.request_render()
 
     def search_news(self):
+        from tickernews import build_search_queries, fetch_news_for_queries
+
         ticker = self.get_selected_ticker()
         queries = build_search_queries(ticker)
         news = fetch_news_for_queries(queries, days=5)
@@ -299,8 +712,48 @@ class StockApp(QWidget):
         self.news_dialogs.append(dialog)
         dialog.show()
 
-    def toggle_auto_refresh(self, state):
+    def toggle_live_quotes(self, state):
         if state == 2:
-            self.timer.start()
+            self.quote_stream.start(self.config["tickers"])
         else:
-            self.timer.stop()
+            self.quote_stream.stop()
+
+    def queue_live_update(self, ticker):
+        # ticks arriving close together are folded in and drawn once
+        if not self.live_timer.isActive():
+            self.live_timer.start()
+
+    def apply_live_quotes(self):
+        updated = self.quote_stream.aggregator.drain()
+        for ticker, bars in updated.items():
+            # bars are only queued here; the open chart folds its own in when it redraws below
+            queue_live_bars(ticker, bars)
+            self.ticker_model.set_quote(ticker, self.format_quote(*live_change(ticker, bars)))
+        ticker = self.get_selected_ticker()
+        if ticker in updated and ticker == self.live_chart and not self.render_timer.isActive():
+            self.render_live_plot(ticker)
+
+    def format_quote(self, price, change):
+        if change is None:
+            return f"{price:,.2f}"
+        return f"{price:,.2f} ({change:+.2f}%)"
+
+    def render_live_plot(self, ticker):
+        df = fetch_market_data(
+            ticker, self.config["period"], refresh=False, interval=self.current_interval(),
+            indicator_names=self.indicator_names()
+        )
+        if df.empty:
+            return
+        self.change_summary.setTextFormat(Qt.RichText)
+        self.change_summary.setText(self.format_change_summary(calculate_price_changes(df)))
+        fig = create_plot_figure(
+            df, ticker,
+            self.config["chart_type"],
+            self.config["theme"],
+            self.config["main_indicator"],
+            self.config["sub_indicator"],
+            self.config["timezone"],
+            self.current_interval()
+        )
+        self.web_view.page().runJavaScript(fig.to_react())